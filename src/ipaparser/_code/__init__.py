@@ -1,11 +1,24 @@
-from .cacher import load
-from .ipa import IPA
+from .cacher import cache_clear, cache_info, CacheInfo, flight_info, FlightInfo, load, set_cache_size
+from .ipa import IPA, parse_variants
 from .ipa_config import IPAConfig
 from .ipa_symbol import IPASymbol
+from .normalizer import normalize
+from .parse_store import use_persistent_cache
+from .parser_session import ParserSession
 
 __all__ = [
+    'cache_clear',
+    'cache_info',
+    'CacheInfo',
+    'flight_info',
+    'FlightInfo',
     'IPA',
     'IPAConfig',
     'IPASymbol',
     'load',
+    'normalize',
+    'parse_variants',
+    'ParserSession',
+    'set_cache_size',
+    'use_persistent_cache',
 ]
@@ -0,0 +1,54 @@
+from collections import deque
+from typing import Iterable
+
+__all__ = [
+    'Automaton',
+]
+
+
+class Automaton:
+    """Aho–Corasick automaton determining which of a number of keywords occur in a string in a single pass."""
+
+    _transitions: list[dict[str, int]]
+    _fallbacks: list[int]
+    _outputs: list[frozenset[int]]  # indices of the keywords ending at a state, including via its fallbacks
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self._transitions = [{}]
+        outputs: list[set[int]] = [set()]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for character in keyword:
+                if (next_state := self._transitions[state].get(character)) is None:
+                    next_state = len(self._transitions)
+                    self._transitions[state][character] = next_state
+                    self._transitions.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(index)
+
+        self._fallbacks = [0] * len(self._transitions)
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._transitions[state].items():
+                fallback = self._fallbacks[state]
+                while fallback and character not in self._transitions[fallback]:
+                    fallback = self._fallbacks[fallback]
+                self._fallbacks[next_state] = self._transitions[fallback].get(character, 0)
+                outputs[next_state] |= outputs[self._fallbacks[next_state]]  # breadth-first: already complete
+                queue.append(next_state)
+        self._outputs = list(map(frozenset, outputs))
+
+    def find(self, string: str) -> set[int]:
+        """Return the indices of the keywords occurring in the string."""
+        transitions, fallbacks, outputs = self._transitions, self._fallbacks, self._outputs
+        found: set[int] = set()
+        state = 0
+        for character in string:
+            while state and character not in transitions[state]:
+                state = fallbacks[state]
+            state = transitions[state].get(character, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
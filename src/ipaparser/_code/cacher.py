@@ -1,11 +1,25 @@
-from typing import Any, Callable, TypeVar
+from functools import lru_cache
+from threading import Event, Lock
+from typing import Any, Callable, Generic, Hashable, NamedTuple, Optional, Protocol, TypeVar
+
+from .exceptions import CacheError
 
 __all__ = [
+    'cache_clear',
+    'cache_info',
+    'CacheInfo',
+    'flight_info',
+    'FlightInfo',
     'load',
+    'register_cache',
+    'set_cache_size',
     'with_cache',
+    'with_memo',
+    'with_single_flight',
 ]
 
 T = TypeVar('T')
+C = TypeVar('C', bound='Cache')
 
 CACHE: dict[Callable, Any] = {}
 RETRIEVERS: dict[Callable, Callable] = {}
@@ -25,3 +39,203 @@ def load() -> None:
     """Eagerly load and preprocess supporting data so that the first parse is a bit faster."""
     for retrieve in RETRIEVERS.values():
         retrieve()
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of one of the internal caches."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class Cache(Protocol):
+    """Anything exposed to the public cache controls (`cache_info`, `cache_clear`, and `set_cache_size`)."""
+
+    @property
+    def maxsize(self) -> int:
+        ...
+
+    def resize(self, maxsize: int) -> None:
+        ...
+
+    def info(self) -> CacheInfo:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class Memo(Generic[T]):
+    """A bounded LRU memo around a function of hashable arguments; can be resized at runtime."""
+
+    _function: Callable[..., T]
+    _cached: Callable[..., T]
+    _maxsize: int
+
+    def __init__(self, function: Callable[..., T], maxsize: int) -> None:
+        self._function = function
+        self.resize(maxsize)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T:
+        return self._cached(*args, **kwargs)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def resize(self, maxsize: int) -> None:
+        self._maxsize = max(maxsize, 0)
+        self._cached = lru_cache(maxsize=self._maxsize)(self._function)
+
+    def info(self) -> CacheInfo:
+        hits, misses, _, currsize = self._cached.cache_info()  # type: ignore
+        return CacheInfo(hits, misses, self._maxsize, currsize)
+
+    def clear(self) -> None:
+        self._cached.cache_clear()  # type: ignore
+
+
+MEMOS: dict[str, Cache] = {}
+
+
+def register_cache(name: str, cache: C) -> C:
+    assert name not in MEMOS
+    MEMOS[name] = cache
+    return cache
+
+
+def with_memo(name: str, maxsize: int) -> Callable[[Callable[..., T]], Memo[T]]:
+    def register(function: Callable[..., T]) -> Memo[T]:
+        return register_cache(name, Memo(function, maxsize))
+
+    return register
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Return hit/miss statistics and sizes of the internal caches, by cache name."""
+    return {name: memo.info() for name, memo in MEMOS.items()}
+
+
+def cache_clear(name: Optional[str] = None) -> None:
+    """Empty (and reset the statistics of) the internal cache with the given name or, by default, of all caches.
+
+    :raises:
+        CacheError: There is no cache with the given name.
+    """
+    for memo in ([get_memo(name)] if name is not None else MEMOS.values()):
+        memo.clear()
+
+
+def set_cache_size(name: str, maxsize: int) -> None:
+    """Set the maximum number of entries kept by the internal cache with the given name (0 disables the cache).
+
+    The cache is emptied in the process.
+
+    :raises:
+        CacheError: There is no cache with the given name.
+    """
+    get_memo(name).resize(maxsize)
+
+
+def get_memo(name: str) -> Cache:
+    if name not in MEMOS:
+        raise CacheError(name, list(MEMOS.keys()))
+    return MEMOS[name]
+
+
+class FlightInfo(NamedTuple):
+    """Statistics of deduplicating concurrent identical computations."""
+
+    calls: int
+    coalesced: int  # calls that waited for an identical call in progress and shared its result
+    in_flight: int
+
+
+class Flight(Generic[T]):
+    """The outcome of a computation in progress, to be waited for by identical calls."""
+
+    _done: Event
+    _result: Optional[T]
+    _exception: Optional[BaseException]
+
+    def __init__(self) -> None:
+        self._done = Event()
+        self._result = None
+        self._exception = None
+
+    def result(self) -> T:
+        self._done.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._result  # type: ignore
+
+    def set_result(self, result: T) -> None:
+        self._result = result
+        self._done.set()
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._done.set()
+
+
+class SingleFlight(Generic[T]):
+    """A wrapper letting concurrent calls with equal (hashable) arguments share a single computation."""
+
+    _function: Callable[..., T]
+    _lock: Lock
+    _flights: dict[Hashable, Flight[T]]
+    _calls: int
+    _coalesced: int
+
+    def __init__(self, function: Callable[..., T]) -> None:
+        self._function = function
+        self._lock = Lock()
+        self._flights = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T:
+        key = args, tuple(sorted(kwargs.items()))
+        with self._lock:
+            self._calls += 1
+            if (flight := self._flights.get(key)) is None:
+                leading: Flight[T] = Flight()
+                self._flights[key] = leading
+            else:
+                self._coalesced += 1
+        if flight is not None:
+            return flight.result()
+        try:
+            result = self._function(*args, **kwargs)
+        except BaseException as exception:
+            leading.set_exception(exception)
+            raise
+        else:
+            leading.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def info(self) -> FlightInfo:
+        with self._lock:
+            return FlightInfo(self._calls, self._coalesced, len(self._flights))
+
+
+FLIGHTS: dict[str, SingleFlight] = {}
+
+
+def with_single_flight(name: str) -> Callable[[Callable[..., T]], SingleFlight[T]]:
+    def register(function: Callable[..., T]) -> SingleFlight[T]:
+        assert name not in FLIGHTS
+        FLIGHTS[name] = SingleFlight(function)
+        return FLIGHTS[name]
+
+    return register
+
+
+def flight_info() -> dict[str, FlightInfo]:
+    """Return statistics of how concurrent identical computations are deduplicated, by computation name."""
+    return {name: flight.info() for name, flight in FLIGHTS.items()}
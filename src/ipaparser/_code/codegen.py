@@ -0,0 +1,76 @@
+from hashlib import sha256
+from importlib.util import MAGIC_NUMBER
+import marshal
+from types import CodeType
+from typing import Callable, Optional
+
+from .data_types import Transformation
+from .disk_cache import read_cache, write_cache
+from .feature_helper import FeatureMask
+
+__all__ = [
+    'compile_functions',
+    'generate_applicability',
+    'generate_first_applicable',
+    'Applicability',
+    'FirstApplicable',
+]
+
+Applicability = Callable[[FeatureMask], list[int]]
+FirstApplicable = Callable[[FeatureMask], Optional[int]]
+
+CACHE_PREFIX = 'transformations'
+INDENT = ' ' * 4
+
+
+def generate_condition(transformation: Transformation) -> str:
+    conditions: list[str] = []
+    if present := transformation.present:
+        conditions.append(f'features & {present:#x} == {present:#x}')
+    if absent := transformation.absent:
+        conditions.append(f'not features & {absent:#x}')
+    return ' and '.join(conditions) or 'True'
+
+
+def generate_applicability(name: str, transformations: list[Transformation]) -> str:
+    """Generate a function returning the indices of the transformations applicable to the features."""
+    lines = [f'def {name}(features):', f'{INDENT}applicable = []']
+    for index, transformation in enumerate(transformations):
+        lines.append(f'{INDENT}if {generate_condition(transformation)}:')
+        lines.append(f'{INDENT * 2}applicable.append({index})')
+    lines.append(f'{INDENT}return applicable')
+    return '\n'.join(lines)
+
+
+def generate_first_applicable(name: str, transformations: list[Transformation]) -> str:
+    """Generate a function returning the index of the first transformation applicable to the features (if any)."""
+    lines = [f'def {name}(features):']
+    for index, transformation in enumerate(transformations):
+        lines.append(f'{INDENT}if {generate_condition(transformation)}:')
+        lines.append(f'{INDENT * 2}return {index}')
+    lines.append(f'{INDENT}return None')
+    return '\n'.join(lines)
+
+
+def compile_source(source: str) -> CodeType:
+    # Compiling is by far the most expensive step, so the code is cached on disk under a name that changes whenever
+    # either the source or the Python bytecode format does
+    name = f'{CACHE_PREFIX}-{sha256(MAGIC_NUMBER + source.encode()).hexdigest()[:32]}.marshal'
+    if (cached := read_cache(name)) is not None:
+        try:
+            code = marshal.loads(cached)
+        except (EOFError, TypeError, ValueError):
+            pass
+        else:
+            if isinstance(code, CodeType):
+                return code
+    code = compile(source, f'<{CACHE_PREFIX}>', 'exec')
+    write_cache(name, marshal.dumps(code), replaces=f'{CACHE_PREFIX}-')
+    return code
+
+
+def compile_functions(definitions: dict[str, str]) -> dict[str, Callable]:
+    """Compile generated function definitions (keyed by function names) and return the functions by their names."""
+    namespace: dict[str, object] = {}
+    exec(compile_source('\n\n\n'.join(definitions.values())), namespace)
+    return {name: namespace[name] for name in definitions}  # type: ignore
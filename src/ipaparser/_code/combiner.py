@@ -1,14 +1,15 @@
+from collections import deque
 from dataclasses import dataclass
-from functools import partial
 from typing import Iterable, Optional, TypeVar
 
-from .cacher import with_cache
-from .data import get_data
+from .cacher import with_cache, with_memo
+from .data import get_data, get_data_fingerprint
 from .data_types import ChangeSequence, Combining, CombiningType, DataError, Symbol, Transformation
-from .feature_helper import extend
-from .features import FeatureSet
+from .feature_helper import extend, FeatureMask
 from .matcher import Match, Matcher, MatchOption
+from .snapshot import with_snapshot
 from .strings import StringPosition, to_positions
+from .transformation_index import get_transformation_index
 
 __all__ = [
     'apply_position',
@@ -18,6 +19,9 @@ __all__ = [
 
 T = TypeVar('T')
 
+DIACRITIC_CACHE_SIZE = 1 << 14
+POSITION_CACHE_SIZE = 1 << 14
+
 
 def not_none(values: Iterable[Optional[T]]) -> list[T]:
     return [value for value in values if value is not None]
@@ -25,51 +29,53 @@ def not_none(values: Iterable[Optional[T]]) -> list[T]:
 
 @dataclass(frozen=True)
 class AppliedCombiningData:
-    features: FeatureSet
+    features: FeatureMask
     transformations: list[Transformation]
 
 
 def apply_combining(
         combining: Combining,
-        features: FeatureSet,
+        features: FeatureMask,
         *,
         basic: bool = False,
         meta: Optional[list[Combining]] = None,
         allowed: Optional[set[ChangeSequence]] = None,
         disallowed: Optional[set[ChangeSequence]] = None,
 ) -> Optional[AppliedCombiningData]:
-    data = get_data()
-    transformations = (data.combining_basic if basic else data.combining_main).get(combining, [])
-    for transformation in transformations:
-        if (transformation.changes not in (disallowed or set())
-                and (transformation.changes in (allowed or set()) or transformation.is_applicable(features))):
-            applied_transformations: list[Transformation] = []
-
-            def apply(current_transformation: transformation) -> None:
-                nonlocal features
-                features = current_transformation.apply(features)
-                applied_transformations.append(current_transformation)
-
-            apply(transformation)
-            positive_changes = {change.feature for change in transformation.changes if change.is_positive}
-            for index, meta_transformations in enumerate(data.combining_meta.get(meta_combining, [])
-                                                         for meta_combining in (meta or [])):
-                for meta_transformation in meta_transformations:
-                    if meta_transformation.required == positive_changes and meta_transformation.is_applicable(features):
-                        apply(meta_transformation)
-                        break
-                else:
-                    return None
-            return AppliedCombiningData(features, applied_transformations)
-    return None
+    index = get_transformation_index()
+    if not (transformation := index.find(combining, features, basic=basic, allowed=allowed, disallowed=disallowed)):
+        return None
+    features = transformation.apply(features)
+    applied_transformations = [transformation]
+    for meta_combining in (meta or []):
+        if not (meta_transformation := index.find_meta(meta_combining, features, transformation.positive_changes)):
+            return None
+        features = meta_transformation.apply(features)
+        applied_transformations.append(meta_transformation)
+    return AppliedCombiningData(features, applied_transformations)
 
 
 def wrap_diacritics(diacritics: Iterable[str]) -> list[Combining]:
     return [Combining(diacritic, CombiningType.DIACRITIC) for diacritic in diacritics]
 
 
-def apply_position_single(position: StringPosition, features: FeatureSet,
-                          *, is_preceding: bool) -> Optional[FeatureSet]:
+def collect_modifiers() -> dict[bool, frozenset[str]]:
+    # Characters that may modify a preceding (False) or a following (True) symbol, keyed by `is_preceding`
+    combining_main = get_data().combining_main
+    return {
+        is_preceding: frozenset(combining.character for combining in combining_main.keys()
+                                if combining.type == (CombiningType.PRECEDING if is_preceding
+                                                      else CombiningType.FOLLOWING))
+        for is_preceding in [False, True]
+    }
+
+
+get_modifiers = with_cache(collect_modifiers)
+
+
+@with_memo('positions', POSITION_CACHE_SIZE)
+def apply_position_single(position: StringPosition, features: FeatureMask,
+                          *, is_preceding: bool) -> Optional[FeatureMask]:
     main, diacritics = position[0], position[1:]
     applied = apply_combining(
         combining=Combining(
@@ -82,8 +88,11 @@ def apply_position_single(position: StringPosition, features: FeatureSet,
     return applied.features if applied else None
 
 
-def apply_position(position: StringPosition, feature_sets: list[FeatureSet], *, is_preceding: bool) -> list[FeatureSet]:
-    return not_none(map(partial(apply_position_single, position, is_preceding=is_preceding), feature_sets))
+def apply_position(position: StringPosition, feature_sets: list[FeatureMask],
+                   *, is_preceding: bool) -> list[FeatureMask]:
+    if position[0] not in get_modifiers()[is_preceding]:
+        return []
+    return not_none(apply_position_single(position, features, is_preceding=is_preceding) for features in feature_sets)
 
 
 def extend_symbol(symbol: Symbol) -> Symbol:
@@ -126,11 +135,12 @@ def collect_basic_symbols() -> set[Symbol]:
     return check_basic_symbol_uniqueness(non_combined | collect_basic_combined_symbols(non_combined))
 
 
+@with_snapshot('matcher', get_data_fingerprint)
 def build_matcher() -> Matcher[Symbol]:
-    def option_key(option: MatchOption[Symbol]) -> tuple[int, ...]:
+    def option_key(symbol: Symbol) -> tuple[int, ...]:
         return (
-            0 if option.data.is_main_interpretation else 1,
-            -len(option.data.string),
+            0 if symbol.is_main_interpretation else 1,
+            -len(symbol.string),
         )
 
     return Matcher([(to_positions(symbol.string), symbol) for symbol in collect_basic_symbols()], option_key)
@@ -139,33 +149,39 @@ def build_matcher() -> Matcher[Symbol]:
 get_matcher = with_cache(build_matcher)
 
 
+def negate(sequence: ChangeSequence) -> ChangeSequence:
+    return tuple(change.negate() for change in sequence)
+
+
 def apply_match_position(diacritics: list[Combining], history: set[ChangeSequence],
-                         features: FeatureSet) -> Optional[tuple[FeatureSet, set[ChangeSequence]]]:
+                         features: FeatureMask) -> Optional[tuple[FeatureMask, set[ChangeSequence]]]:
+    # Diacritics are applied in order; those that cannot be applied yet are retried after the others, but only once
+    # something has been applied since their last attempt (an attempt in the same state would fail again)
     changes: set[ChangeSequence] = set()
-    while True:
-        remaining: list[Combining] = []
-        for combining in diacritics:
-            if applied := apply_combining(
-                    combining,
-                    features,
-                    allowed=history - changes,
-                    disallowed=set(tuple(change.negate() for change in sequence) for sequence in history | changes),
-            ):
-                features = applied.features
-                changes.update(transformation.changes for transformation in applied.transformations)
-            else:
-                remaining.append(combining)
-        if not remaining:
-            return features, changes
-        if len(remaining) == len(diacritics):
-            return None
-        diacritics = remaining
+    allowed = set(history)
+    disallowed = set(map(negate, history))
+    pending = deque(diacritics)
+    stale = 0  # number of pending diacritics that have failed since something was last applied
+    while stale < len(pending):
+        combining = pending.popleft()
+        if applied := apply_combining(combining, features, allowed=allowed, disallowed=disallowed):
+            features = applied.features
+            for transformation in applied.transformations:
+                if transformation.changes not in changes:
+                    changes.add(transformation.changes)
+                    allowed.discard(transformation.changes)
+                    disallowed.add(negate(transformation.changes))
+            stale = 0
+        else:
+            pending.append(combining)
+            stale += 1
+    return (features, changes) if not pending else None
 
 
-def match_option_to_features(match: MatchOption[Symbol]) -> Optional[FeatureSet]:
-    features = match.data.features
+@with_memo('diacritics', DIACRITIC_CACHE_SIZE)
+def apply_diacritics(features: FeatureMask, combining: tuple[str, ...]) -> Optional[FeatureMask]:
     history: set[ChangeSequence] = set()
-    for position in match.combining:
+    for position in combining:
         if applied := apply_match_position(wrap_diacritics(position), history, features):
             features, changes = applied
             history.update(changes)
@@ -174,5 +190,9 @@ def match_option_to_features(match: MatchOption[Symbol]) -> Optional[FeatureSet]
     return features
 
 
-def match_to_feature_sets(match: Match[Symbol]) -> list[FeatureSet]:
+def match_option_to_features(match: MatchOption[Symbol]) -> Optional[FeatureMask]:
+    return apply_diacritics(match.data.features, tuple(map(''.join, match.combining)))
+
+
+def match_to_feature_sets(match: Match[Symbol]) -> list[FeatureMask]:
     return not_none(map(match_option_to_features, match.options))
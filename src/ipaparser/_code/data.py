@@ -1,3 +1,6 @@
+from functools import reduce
+from hashlib import sha256
+from operator import or_
 from pathlib import Path
 from typing import Optional
 import unicodedata
@@ -20,12 +23,14 @@ from .data_types import (
     Transformation,
 )
 from .definitions import TranscriptionType
-from .feature_helper import find_feature, find_feature_kind
-from .features import Feature, FeatureKind, FeatureSet
+from .feature_helper import FEATURE_MASKS, FeatureMask, find_feature, find_feature_kind, KIND_MASKS, to_mask
+from .features import Feature, FeatureKind
+from .snapshot import fingerprint_files, with_snapshot
 from .strings import is_decomposed
 
 __all__ = [
     'get_data',
+    'get_data_fingerprint',
 ]
 
 COLUMN_DELIMITER = '\t'
@@ -82,8 +87,8 @@ def get_feature(value: str) -> Feature:
     return feature
 
 
-def get_feature_conjunction(value: str) -> FeatureSet:
-    return frozenset(map(get_feature, value.split(CONJUNCTION_DELIMITER)))
+def get_feature_conjunction(value: str) -> FeatureMask:
+    return to_mask(map(get_feature, value.split(CONJUNCTION_DELIMITER)))
 
 
 def get_feature_kind(value: str) -> FeatureKind:
@@ -93,7 +98,7 @@ def get_feature_kind(value: str) -> FeatureKind:
     return kind
 
 
-def parse_symbol(string: str, features: FeatureSet) -> Symbol:
+def parse_symbol(string: str, features: FeatureMask) -> Symbol:
     left_bracket, right_bracket = META_BRACKETS
     is_alternative = string.startswith(left_bracket) and string.endswith(right_bracket)
     symbol = string.removeprefix(left_bracket).removesuffix(right_bracket) if is_alternative else string
@@ -116,8 +121,8 @@ def parse_letter_data(data: TabularData) -> set[Symbol]:
     if any(len(row) != column_count for row in data):
         raise DataError(f'Letter data must be a rectangular grid')
 
-    def to_features(values: list[str]) -> FeatureSet:
-        return frozenset(map(get_feature, values))
+    def to_features(values: list[str]) -> FeatureMask:
+        return to_mask(map(get_feature, values))
 
     common_set = to_features(data[0][0])
     column_sets = [to_features(column) for column in data[0]]
@@ -141,7 +146,7 @@ def parse_non_letter_symbol_data(data: TabularData) -> set[Symbol]:
         if len(features) != 1:
             raise DataError(f'Expected exactly one feature, got "{VALUE_DELIMITER.join(features)}"')
         for symbol in symbol_options:
-            symbols.add(parse_symbol(symbol, frozenset({get_feature(features[0])})))
+            symbols.add(parse_symbol(symbol, FEATURE_MASKS[get_feature(features[0])]))
     return symbols
 
 
@@ -165,15 +170,15 @@ def parse_combining(definition: str) -> Combining:
         )
 
 
-def parse_incompatible(definition: str) -> FeatureSet:
+def parse_incompatible(definition: str) -> FeatureMask:
     if not definition.startswith(INCOMPATIBLE_PREFIX):
         raise DataError(f'Definition of incompatible features must start with "{INCOMPATIBLE_PREFIX}",'
                         f' got "{definition}"')
     value = definition.removeprefix(INCOMPATIBLE_PREFIX)
     left_bracket, right_bracket = META_BRACKETS
-    return (frozenset(get_feature_kind(value.removeprefix(left_bracket).removesuffix(right_bracket)))
+    return (KIND_MASKS[get_feature_kind(value.removeprefix(left_bracket).removesuffix(right_bracket))]
             if value.startswith(left_bracket) and value.endswith(right_bracket)
-            else frozenset({get_feature(value)}))
+            else FEATURE_MASKS[get_feature(value)])
 
 
 def parse_change(definition: str) -> Optional[Change]:
@@ -205,9 +210,9 @@ def parse_combining_data(data: TabularData) -> CombiningData:
         if incompatible_content is not None:
             if not incompatible_content:
                 raise DataError(f'Expected an incompatible feature or feature kind, got an empty cell')
-            incompatible = frozenset().union(*map(parse_incompatible, incompatible_content))
+            incompatible = reduce(or_, map(parse_incompatible, incompatible_content))
         else:
-            incompatible = frozenset()
+            incompatible = 0
         to_append = [Transformation(required, incompatible, tuple(filter(None, map(parse_change, changes))))
                      for required in required_feature_sets]
         for definition in characters:
@@ -280,6 +285,17 @@ def parse_substitution_data(data: TabularData) -> SubstitutionData:
     return substitutions
 
 
+def compute_data_fingerprint() -> str:
+    # Changes whenever anything derived from the data may change: the data files themselves or the feature encoding
+    digest = sha256(fingerprint_files(DIRECTORY).encode())
+    digest.update(' '.join(f'{feature.value}={mask:#x}' for feature, mask in FEATURE_MASKS.items()).encode())
+    return digest.hexdigest()
+
+
+get_data_fingerprint = with_cache(compute_data_fingerprint)
+
+
+@with_snapshot('data', get_data_fingerprint)
 def load_data() -> Data:
     ties, main_tie = parse_tie_data(read(TIES))
     outer_brackets, inner_brackets = parse_bracket_data(read(BRACKETS))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
+from typing import NamedTuple
 
 from .definitions import TranscriptionType
-from .features import Feature, FeatureSet
+from .feature_helper import FEATURE_MASKS, FeatureMask
+from .features import Feature
 
 __all__ = [
     'Bracket',
@@ -34,8 +36,7 @@ class CombiningType(str, Enum):
     PRECEDING = 'preceding'
 
 
-@dataclass(frozen=True)
-class Combining:
+class Combining(NamedTuple):
     character: str
     type: CombiningType
 
@@ -43,8 +44,7 @@ class Combining:
         return self.character + string if self.type == CombiningType.PRECEDING else string + self.character
 
 
-@dataclass(frozen=True)
-class Change:
+class Change(NamedTuple):
     feature: Feature
     is_positive: bool
 
@@ -55,28 +55,87 @@ class Change:
 ChangeSequence = tuple[Change, ...]
 
 
-@dataclass(frozen=True)
 class Transformation:
-    required: FeatureSet
-    incompatible: FeatureSet
-    changes: ChangeSequence
-
-    def is_applicable(self, features: FeatureSet) -> bool:
-        return (self.required <= features
-                and features.isdisjoint(self.incompatible)
-                and all((change.feature in features) != change.is_positive for change in self.changes))
+    # A plain class rather than a frozen dataclass, as the derived masks are kept in slots along with the fields
+    __slots__ = ('required', 'incompatible', 'changes', '_present', '_absent', '_added', '_subtracted', '_positive')
 
-    def apply(self, features: FeatureSet) -> FeatureSet:
-        for change in self.changes:
-            features = features | {change.feature} if change.is_positive else features - {change.feature}
-        return features
-
-
-@dataclass(frozen=True)
-class Symbol:
+    required: FeatureMask
+    incompatible: FeatureMask
+    changes: ChangeSequence
+    _present: FeatureMask  # required and subtracted features
+    _absent: FeatureMask  # incompatible and added features
+    _added: FeatureMask
+    _subtracted: FeatureMask
+    _positive: FeatureMask
+
+    def __init__(self, required: FeatureMask, incompatible: FeatureMask, changes: ChangeSequence) -> None:
+        self.required = required
+        self.incompatible = incompatible
+        self.changes = changes
+        present, absent, added, subtracted, positive = required, incompatible, 0, 0, 0
+        for change in changes:
+            mask = FEATURE_MASKS[change.feature]
+            if change.is_positive:
+                absent |= mask
+                positive |= mask
+                added, subtracted = added | mask, subtracted & ~mask
+            else:
+                present |= mask
+                added, subtracted = added & ~mask, subtracted | mask
+        self._present = present
+        self._absent = absent
+        self._added = added
+        self._subtracted = subtracted
+        self._positive = positive
+
+    def _key(self) -> tuple[FeatureMask, FeatureMask, ChangeSequence]:
+        return self.required, self.incompatible, self.changes
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Transformation):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (f'Transformation(required={self.required!r}, incompatible={self.incompatible!r},'
+                f' changes={self.changes!r})')
+
+    def __reduce__(self) -> tuple[type[Transformation], tuple[FeatureMask, FeatureMask, ChangeSequence]]:
+        return Transformation, self._key()
+
+    @property
+    def present(self) -> FeatureMask:
+        """Features that must be present for the transformation to be applicable."""
+        return self._present
+
+    @property
+    def absent(self) -> FeatureMask:
+        """Features that must be absent for the transformation to be applicable."""
+        return self._absent
+
+    @property
+    def dependencies(self) -> FeatureMask:
+        """Features whose presence or absence determines whether the transformation is applicable."""
+        return self._present | self._absent
+
+    @property
+    def positive_changes(self) -> FeatureMask:
+        return self._positive
+
+    def is_applicable(self, features: FeatureMask) -> bool:
+        return features & self._present == self._present and not features & self._absent
+
+    def apply(self, features: FeatureMask) -> FeatureMask:
+        return features & ~self._subtracted | self._added
+
+
+class Symbol(NamedTuple):
     string: str  # guaranteed to be non-empty
     is_main_interpretation: bool
-    features: FeatureSet
+    features: FeatureMask
 
 
 CombiningData = dict[Combining, list[Transformation]]
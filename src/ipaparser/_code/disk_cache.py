@@ -0,0 +1,91 @@
+from contextlib import suppress
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+import time
+from typing import Optional
+
+__all__ = [
+    'get_directory',
+    'read_cache',
+    'write_cache',
+]
+
+DIRECTORY_VARIABLE = 'IPAPARSER_CACHE_DIR'  # an empty value disables persistent caches
+DEFAULT_NAME = 'ipaparser'
+DIRECTORY_MODE = 0o700
+STALE_AGE = 30 * 24 * 60 * 60  # seconds since a cache file was last used, after which it is considered abandoned
+
+
+def locate_directory() -> Optional[Path]:
+    if (configured := os.environ.get(DIRECTORY_VARIABLE)) is not None:
+        return Path(configured) if configured else None
+    if base := os.environ.get('XDG_CACHE_HOME'):
+        return Path(base) / DEFAULT_NAME
+    try:
+        return Path.home() / '.cache' / DEFAULT_NAME
+    except (KeyError, RuntimeError):  # no home directory to be found (e.g., in some containers), so no caching
+        return None
+
+
+def is_private(directory: Path) -> bool:
+    # The cached files hold code (compiled functions and pickled objects), so they are only trusted in a directory that
+    # nobody else can write to; where there is no POSIX ownership (on Windows), user directories are private anyway
+    if not hasattr(os, 'getuid'):
+        return True
+    status = directory.stat()
+    return status.st_uid == os.getuid() and not status.st_mode & 0o077
+
+
+def get_directory() -> Optional[Path]:
+    """Return the directory of persistent caches (creating it if necessary), or None if they are disabled or the
+    directory cannot be trusted."""
+    if not (directory := locate_directory()):
+        return None
+    try:
+        directory.mkdir(mode=DIRECTORY_MODE, parents=True, exist_ok=True)
+        return directory if is_private(directory) else None
+    except OSError:
+        return None
+
+
+def read_cache(name: str) -> Optional[bytes]:
+    if not (directory := get_directory()):
+        return None
+    try:
+        content = (directory / name).read_bytes()
+    except OSError:
+        return None
+    with suppress(OSError):
+        os.utime(directory / name)  # so that the file is known to be in use (see `remove_stale`)
+    return content
+
+
+def remove_stale(directory: Path, name: str, prefix: str) -> None:
+    # Files left by other versions of the library or of the data would otherwise pile up forever; the ones still in use
+    # (e.g., by another environment sharing the directory) are kept, so that environments do not evict each other's
+    threshold = time.time() - STALE_AGE
+    for file in directory.glob(f'{prefix}*'):
+        with suppress(OSError):
+            if file.name != name and file.stat().st_mtime < threshold:
+                file.unlink()
+
+
+def write_cache(name: str, content: bytes, *, replaces: str = '') -> None:
+    # Persistent caches are an optimization only, so failing to write one (e.g., in a read-only environment) is ignored;
+    # the file is replaced atomically so that concurrent readers never see it partially written. Other files whose names
+    # start with a nonempty `replaces` are considered outdated versions of this one and are removed once abandoned
+    if not (directory := get_directory()):
+        return
+    temporary: Optional[str] = None
+    try:
+        with NamedTemporaryFile(dir=directory, prefix=f'.{name}.', delete=False) as file:
+            temporary = file.name
+            file.write(content)
+        os.replace(temporary, directory / name)
+        if replaces:
+            remove_stale(directory, name, replaces)
+    except OSError:
+        if temporary:
+            with suppress(OSError):
+                os.unlink(temporary)
@@ -1,4 +1,5 @@
 from .bracket_strategy import BracketStrategyError
+from .cache import CacheError
 from .combined_length import CombinedLengthError
 from .combined_sound import CombinedSoundError
 from .enclosing import EnclosingError
@@ -8,6 +9,7 @@ from .incompatible_types import IncompatibleTypesError
 
 __all__ = [
     'BracketStrategyError',
+    'CacheError',
     'CombinedLengthError',
     'CombinedSoundError',
     'EnclosingError',
@@ -0,0 +1,12 @@
+__all__ = [
+    'CacheError',
+]
+
+
+class CacheError(ValueError):
+    value: str
+
+    def __init__(self, value: str, valid: list[str]) -> None:
+        super().__init__(f'{repr(value)} is not a valid cache;'
+                         f' use one of the following: {"/".join(map(repr, valid))}')
+        self.value = value
@@ -1,13 +1,19 @@
-from typing import Optional, TypeVar
+from typing import Iterable, Iterator, Optional, TypeVar
 
+from .cacher import with_memo
 from .features import Feature, FEATURE_KINDS, FeatureKind, FeatureSet
 
 __all__ = [
-    'equivalent',
     'extend',
+    'FEATURE_MASKS',
+    'FeatureMask',
     'find_feature',
     'find_feature_kind',
-    'include',
+    'intern_feature_sets',
+    'KIND_MASKS',
+    'to_feature_set',
+    'to_kind_mask',
+    'to_mask',
 ]
 
 T = TypeVar('T')
@@ -15,6 +21,11 @@ T = TypeVar('T')
 FeatureMap = dict[str, Feature]
 KindMap = dict[str, FeatureKind]
 
+FeatureMask = int  # internal encoding of feature sets: each feature is represented by a single bit
+
+FEATURE_SET_CACHE_SIZE = 1 << 12
+FEATURE_LIST_CACHE_SIZE = 1 << 12
+
 
 def append_unique(mapping: dict[str, T], key: str, value: T) -> None:
     assert key not in mapping
@@ -38,6 +49,26 @@ def build_maps() -> tuple[FeatureMap, KindMap]:
 FEATURE_MAP, KIND_MAP = build_maps()
 
 
+def build_masks() -> tuple[tuple[Feature, ...], dict[Feature, FeatureMask], dict[FeatureKind, FeatureMask]]:
+    features: list[Feature] = []
+    feature_masks: dict[Feature, FeatureMask] = {}
+    kind_masks: dict[FeatureKind, FeatureMask] = {}
+
+    for kind in FEATURE_KINDS:
+        kind_masks[kind] = 0
+        for feature in kind:
+            feature: Feature
+            feature_masks[feature] = 1 << len(features)
+            kind_masks[kind] |= feature_masks[feature]
+            features.append(feature)
+
+    kind_masks[Feature] = (1 << len(features)) - 1
+    return tuple(features), feature_masks, kind_masks
+
+
+FEATURES, FEATURE_MASKS, KIND_MASKS = build_masks()
+
+
 def find_feature(value: str) -> Optional[Feature]:
     return FEATURE_MAP.get(value, None)
 
@@ -46,13 +77,43 @@ def find_feature_kind(value: str) -> Optional[FeatureKind]:
     return KIND_MAP.get(value, None)
 
 
-def extend(feature_set: FeatureSet) -> FeatureSet:
-    return frozenset().union(*(feature.extend() for feature in feature_set))
+def to_mask(features: Iterable[Feature]) -> FeatureMask:
+    mask = 0
+    for feature in features:
+        mask |= FEATURE_MASKS[feature]
+    return mask
+
+
+def to_kind_mask(kinds: Iterable[FeatureKind]) -> FeatureMask:
+    mask = 0
+    for kind in kinds:
+        mask |= KIND_MASKS.get(kind, 0)  # feature kinds other than the built-in ones have no features to include
+    return mask
+
+
+def iterate_bits(mask: FeatureMask) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+@with_memo('feature_sets', FEATURE_SET_CACHE_SIZE)
+def to_feature_set(mask: FeatureMask) -> FeatureSet:
+    return frozenset(FEATURES[index] for index in iterate_bits(mask))
+
+
+@with_memo('feature_lists', FEATURE_LIST_CACHE_SIZE)
+def intern_feature_sets(feature_sets: tuple[FeatureMask, ...]) -> list[FeatureMask]:
+    # Symbols with equal interpretations share a single list (and masks), which is never mutated
+    return list(feature_sets)
 
 
-def include(kinds: set[FeatureKind], feature_set: FeatureSet) -> FeatureSet:
-    return frozenset(feature for feature in feature_set if any(isinstance(feature, kind) for kind in kinds))
+EXTENSION_MASKS: tuple[FeatureMask, ...] = tuple(to_mask(feature.extend()) for feature in FEATURES)
 
 
-def equivalent(kinds: set[FeatureKind], a: FeatureSet, b: FeatureSet) -> bool:
-    return include(kinds, a) == include(kinds, b)
+def extend(mask: FeatureMask) -> FeatureMask:
+    extended = 0
+    for index in iterate_bits(mask):
+        extended |= EXTENSION_MASKS[index]
+    return extended
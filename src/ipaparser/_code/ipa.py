@@ -1,16 +1,21 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Iterator, Optional, overload, SupportsIndex, Union
+from typing import Any, Iterable, Iterator, Optional, overload, SupportsIndex, Union
 
+from .cacher import with_cache
 from .data import get_data
 from .definitions import TranscriptionType
 from .exceptions import EnclosingError, IncompatibleTypesError
 from .ipa_config import IPAConfig
 from .ipa_symbol import from_raw, IPASymbol
-from .parser import parse
+from .normalizer import get_pipeline, Pipeline
+from .parser import parse, parse_normalized
+from .strings import decompose
 
 __all__ = [
     'IPA',
+    'parse_variants',
+    'transcription_from_pipeline',
 ]
 
 
@@ -27,17 +32,23 @@ class ParsedEnclosing:
     text: str
 
 
+def build_enclosing_types() -> list[TypeData]:
+    # Shared by all the transcriptions of the same type
+    return [TypeData(type=transcription_type, left_bracket=left, right_bracket=right)
+            for (left, right), transcription_type in get_data().outer_brackets.items()]
+
+
+get_enclosing_types = with_cache(build_enclosing_types)
+
+
 def parse_enclosing(string: str) -> Optional[ParsedEnclosing]:
-    for (left, right), transcription_type in get_data().outer_brackets.items():
+    for enclosing_type in get_enclosing_types():
+        left, right = enclosing_type.left_bracket, enclosing_type.right_bracket
         if (len(string) >= len(left + right)
                 and string.startswith(left)
                 and string.endswith(right)):
             return ParsedEnclosing(
-                type=TypeData(
-                    type=transcription_type,
-                    left_bracket=left,
-                    right_bracket=right,
-                ),
+                type=enclosing_type,
                 text=string.removeprefix(left).removesuffix(right),
             )
     return None
@@ -46,6 +57,8 @@ def parse_enclosing(string: str) -> Optional[ParsedEnclosing]:
 class IPA:
     """Transcription parser."""
 
+    __slots__ = ('_type', '_symbols', '__weakref__')
+
     _type: TypeData
 
     @property
@@ -131,11 +144,40 @@ class IPA:
         :raises:
             EnclosingError: The input string is not properly enclosed in brackets (like [so] or /so/).
         """
+        self._parse(transcription, get_pipeline(config))
+
+    def _parse(self, transcription: str, pipeline: Pipeline) -> None:
         enclosing = parse_enclosing(transcription)
         if not enclosing:
             raise EnclosingError(transcription)
         self._type = enclosing.type
-        self._symbols = [from_raw(symbol) for symbol in parse(enclosing.text, config)]
+        self._symbols = [from_raw(symbol) for symbol in parse(enclosing.text, pipeline)]
+
+    @staticmethod
+    def _from_pipeline(transcription: str, pipeline: Pipeline) -> IPA:
+        ipa = IPA.__new__(IPA)
+        ipa._parse(transcription, pipeline)
+        return ipa
+
+    @staticmethod
+    def _from_pipelines(transcription: str, pipelines: Iterable[Pipeline]) -> list[IPA]:
+        enclosing = parse_enclosing(transcription)
+        if not enclosing:
+            raise EnclosingError(transcription)
+        # Configurations normalizing the input identically share the whole result; the ones that differ only locally
+        # still share the results for the unaffected words (through the word cache)
+        text = decompose(enclosing.text)
+        by_normalized: dict[str, list[IPASymbol]] = {}
+        transcriptions: list[IPA] = []
+        for pipeline in pipelines:
+            if (symbols := by_normalized.get(normalized := pipeline(text))) is None:
+                symbols = [from_raw(symbol) for symbol in parse_normalized(normalized)]
+                by_normalized[normalized] = symbols
+            ipa = IPA.__new__(IPA)
+            ipa._type = enclosing.type
+            ipa._symbols = symbols
+            transcriptions.append(ipa)
+        return transcriptions
 
     def as_string(self) -> str:
         """Return the transcription's underlying (normalized) string."""
@@ -146,3 +188,22 @@ class IPA:
         ipa._type = self._type
         ipa._symbols = symbols
         return ipa
+
+
+transcription_from_pipeline = (
+    # So that package-level privacy of _from_pipeline is maintained
+    IPA._from_pipeline  # noqa
+)
+
+
+def parse_variants(transcription: str, configs: Iterable[IPAConfig]) -> list[IPA]:
+    """Parse a (properly enclosed) transcription string with each of several configurations (see `IPA`), sharing the
+    work among them where possible.
+
+    :param transcription: The string to parse (like '[aɪ pʰiː eɪ]').
+    :param configs: Parsing parameters to use, one by one.
+    :return: The transcription parsed with each of the configurations, in the same order.
+    :raises:
+        EnclosingError: The input string is not properly enclosed in brackets (like [so] or /so/).
+    """
+    return IPA._from_pipelines(transcription, map(get_pipeline, configs))  # noqa
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from typing import Any, Optional, overload, Type, TypeVar, Union
 
+from .cacher import with_memo
 from .exceptions import FeatureError, FeatureKindError
-from .feature_helper import find_feature, find_feature_kind, include
+from .feature_helper import FEATURE_MASKS, FeatureMask, find_feature, find_feature_kind, to_feature_set, to_kind_mask
 from .features import Feature, FeatureKind, FeatureSet, SymbolType
 from .ipa_config import IPAConfig
+from .normalizer import get_pipeline, Pipeline
 from .parser import parse
 from .raw_symbol import RawSymbol
 
@@ -18,12 +20,21 @@ F = TypeVar('F', bound=Feature)
 RelaxedFeature = Union[Feature, str]
 RelaxedFeatureKind = Union[FeatureKind, str]
 
+SYMBOL_CACHE_SIZE = 1 << 12
+
 
 class IPASymbol:
-    """Parser and feature retriever for standalone symbols/sounds."""
+    """Parser and feature retriever for standalone symbols/sounds.
+
+    Symbols are immutable, so constructing one from a string and a configuration equal to those of a recently
+    constructed symbol of the same class returns that very instance. This applies to subclasses as well (unless they
+    override `__new__`), so an overridden `__init__` may be run on an instance that has already been returned before.
+    """
+
+    __slots__ = ('_string', '_feature_sets', '_components', '__weakref__')
 
     _string: str
-    _feature_sets: list[FeatureSet]
+    _feature_sets: list[FeatureMask]
 
     _components: Optional[tuple[IPASymbol, ...]]
 
@@ -67,15 +78,18 @@ class IPASymbol:
     def __bool__(self) -> bool:
         return bool(str(self))
 
+    def __new__(cls, string: Optional[str] = None, config: IPAConfig = IPAConfig()) -> IPASymbol:
+        if string is None:  # internal construction, with the data to be set by the caller
+            return super().__new__(cls)
+        return get_symbol(cls, string, config)
+
     def __init__(self, string: str, config: IPAConfig = IPAConfig()) -> None:
         """Parse a single sound or auxiliary IPA symbol.
 
         :param string: The string to parse (like 'a', 'pʰ', '˦', or 'ˈˈ').
         :param config: Parsing parameters.
         """
-        self._set_raw(symbols[0]
-                      if (symbols := parse(string, config, all_tied=True))
-                      else RawSymbol(string, []))
+        # The symbol has already been parsed (or retrieved) by __new__
 
     def as_string(self) -> str:
         """Return the symbol's underlying (normalized) string."""
@@ -136,16 +150,16 @@ class IPASymbol:
             FeatureKindError: The value(s) of the `kinds` parameter are not valid feature kinds.
             FeatureError: The value of the `role` parameter is not a valid feature.
         """
-        kind_index: Optional[set[FeatureKind]] = (
-            set(map(self._check_normalize_kind, kinds if isinstance(kinds, (set, frozenset)) else {kinds}))
+        kind_mask: Optional[FeatureMask] = (
+            to_kind_mask(map(self._check_normalize_kind, kinds if isinstance(kinds, (set, frozenset)) else {kinds}))
             if kinds is not None else None
         )
-        required_features: set[Feature] = {self._check_normalize_feature(role)} if role is not None else set()
+        required_features: FeatureMask = FEATURE_MASKS[self._check_normalize_feature(role)] if role is not None else 0
         return next(
             (
-                include(kind_index, features) if kind_index is not None else features
+                to_feature_set(features & kind_mask if kind_mask is not None else features)
                 for features in self._feature_sets
-                if features >= required_features
+                if features & required_features == required_features
             ),
             None
         )
@@ -163,7 +177,8 @@ class IPASymbol:
         Whether the symbol is known and has a given feature; strings may be used ('consonant') instead of Feature
         subclass values (with no typing support).
         """
-        return bool(self._feature_sets) and self._check_normalize_feature(feature) in self._feature_sets[0]
+        mask = FEATURE_MASKS[self._check_normalize_feature(feature)]
+        return bool(self._feature_sets) and bool(self._feature_sets[0] & mask)
 
     def is_sound(self) -> bool:
         """Whether the symbol is a known sound."""
@@ -189,6 +204,20 @@ class IPASymbol:
         symbol._set_raw(data)
         return symbol
 
+    def _parse(self, string: str, pipeline: Pipeline) -> None:
+        self._set_raw(symbols[0]
+                      if (symbols := parse(string, pipeline, all_tied=True))
+                      else RawSymbol(string, []))
+
+
+@with_memo('symbols', SYMBOL_CACHE_SIZE)
+def get_symbol(cls: Type[IPASymbol], string: str, config: IPAConfig) -> IPASymbol:
+    # Keyed by the configuration rather than by its pipeline, so that the symbols are shared between all the ways of
+    # parsing with equal configurations (such as sessions) and do not keep pipelines alive
+    symbol = cls.__new__(cls)
+    symbol._parse(string, get_pipeline(config))  # noqa
+    return symbol
+
 
 from_raw = (
     # So that package-level privacy of _from_raw is maintained
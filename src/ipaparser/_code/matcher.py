@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import Any, Callable, Generic, Iterable, Optional, TypeVar
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, Iterable, Iterator, NamedTuple, Optional, TypeVar
 
 from .strings import StringPosition, StringPositions, to_string
 
@@ -12,38 +13,69 @@ __all__ = [
 T = TypeVar('T')
 
 
-@dataclass(frozen=True)
-class MatchOption(Generic[T]):
-    data: T
+# Matches are named tuples, which are compact and cheap to construct; since generic named tuples are only supported
+# starting with Python 3.11, they are made generic by subclassing
+class MatchOptionFields(NamedTuple):
+    data: Any  # T
     combining: list[list[str]]
 
 
-@dataclass(frozen=True)
-class Match(Generic[T]):
+class MatchOption(MatchOptionFields, Generic[T]):
+    __slots__ = ()
+
+
+class MatchFields(NamedTuple):
     length: int
-    options: list[MatchOption[T]]
+    options: list[MatchOption[Any]]  # list[MatchOption[T]]
+
+
+class Match(MatchFields, Generic[T]):
+    __slots__ = ()
 
     @property
     def primary_option(self) -> MatchOption[T]:
         return self.options[0]
 
 
+@dataclass(frozen=True)
+class MatcherNode(Generic[T]):
+    children: dict[str, MatcherNode[T]] = field(default_factory=dict)
+    entries: list[tuple[StringPositions, T]] = field(default_factory=list)  # sorted by the option sorting key
+
+
 class Matcher(Generic[T]):
-    _max_length: int
-    _mapping: dict[str, list[tuple[StringPositions, T]]]
-    _option_sorting_key: Callable[[MatchOption[T]], Any]
-
-    def __init__(self, data: Iterable[tuple[StringPositions, T]],
-                 option_sorting_key: Callable[[MatchOption[T]], Any]) -> None:
-        self._max_length = 0
-        self._mapping = {}
-        for positions, value in data:
-            self._max_length = max(self._max_length, len(positions))
-            key = to_string(positions, combining=False)
-            if key not in self._mapping:
-                self._mapping[key] = []
-            self._mapping[key].append((positions, value))
-        self._option_sorting_key = option_sorting_key
+    _root: MatcherNode[T]
+
+    def __init__(self, data: Iterable[tuple[StringPositions, T]], option_sorting_key: Callable[[T], Any]) -> None:
+        self._root = MatcherNode()
+        for positions, value in sorted(data, key=lambda item: option_sorting_key(item[1])):
+            node = self._root
+            for character in to_string(positions, combining=False):
+                if character not in node.children:
+                    node.children[character] = MatcherNode()
+                node = node.children[character]
+            node.entries.append((positions, value))
+
+    def is_terminal(self, character: str) -> bool:
+        """Whether no match starting with the base character can be longer than one position."""
+        return not ((node := self._root.children.get(character)) and node.children)
+
+    def terminal_positions(self) -> Iterator[StringPosition]:
+        """Yield the single positions of the stored data that cannot be prefixes of longer matches."""
+        for node in self._root.children.values():
+            if not node.children:
+                for positions, _ in node.entries:
+                    yield positions[0]
+
+    def inner_characters(self) -> set[str]:
+        """Return the base characters that occur in the stored data in positions other than the first one."""
+        characters: set[str] = set()
+        nodes = [node for child in self._root.children.values() for node in child.children.items()]
+        while nodes:
+            character, node = nodes.pop()
+            characters.add(character)
+            nodes.extend(node.children.items())
+        return characters
 
     @staticmethod
     def _match_with_combining_single(given: StringPosition, required: StringPosition) -> Optional[list[str]]:
@@ -67,11 +99,25 @@ class Matcher(Generic[T]):
             combining.append(combining_single)
         return combining
 
+    def _walk(self, positions: StringPositions, start: int, end: int) -> list[MatcherNode[T]]:
+        # Nodes along the path of base characters from `start`: the i-th one corresponds to match length i + 1
+        path: list[MatcherNode[T]] = []
+        node = self._root
+        for index in range(start, min(end, len(positions))):
+            child: Optional[MatcherNode[T]] = node.children.get(positions[index][0])
+            if child is None:
+                break
+            path.append(child)
+            node = child
+        return path
+
     def match(self, positions: StringPositions, start: int, length: Optional[int] = None) -> Optional[Match[T]]:
-        for match_length in range(min(self._max_length, len(positions) - start), 0, -1) if length is None else [length]:
+        path = self._walk(positions, start, len(positions) if length is None else start + length)
+        lengths = range(len(path), 0, -1) if length is None else [length] if len(path) == length else []
+        for match_length in lengths:
             given = positions[start:start + match_length]
             if options := [MatchOption(data, combining)
-                           for matched, data in self._mapping.get(to_string(given, combining=False), [])
+                           for matched, data in path[match_length - 1].entries
                            if (combining := Matcher._match_with_combining(given, matched)) is not None]:
-                return Match(match_length, sorted(options, key=self._option_sorting_key))
+                return Match(match_length, options)
         return None
@@ -0,0 +1,136 @@
+import re
+from typing import Optional, Pattern
+
+from .cacher import with_cache, with_memo
+from .data import get_data
+from .data_types import SubstitutionData
+from .definitions import BracketStrategy
+from .ipa_config import IPAConfig
+from .strings import CombinedSequences, decompose, perform_substitutions
+
+__all__ = [
+    'get_pipeline',
+    'normalize',
+    'Pipeline',
+]
+
+PIPELINE_CACHE_SIZE = 1 << 6
+
+
+def compile_substitutions(substitutions: SubstitutionData) -> dict[str, str]:
+    # Substitutions are applied one after another, so a later one may match the output of an earlier one
+    # (e.g., ':' > 'ː' followed by 'tː͡ʂ' > 'ʈː͡ʂ'); to do the same in a single pass, the source of each
+    # substitution is also registered in all the forms that earlier substitutions turn into it
+    rules: dict[str, str] = {}
+    for index, (source, _) in enumerate(substitutions):
+        variants = {source}
+        for earlier_source, earlier_target in reversed(substitutions[:index]):
+            variants |= {variant.replace(earlier_target, earlier_source)
+                         for variant in variants
+                         if earlier_target in variant}
+        for variant in variants:
+            rules.setdefault(variant, perform_substitutions(variant, substitutions))
+    return rules
+
+
+class Normalizer:
+    """Single-pass scanner performing substitutions and handling inner brackets according to a bracket strategy."""
+
+    _pattern: Optional[Pattern[str]]
+    _initials: frozenset[str]
+    _replacements: dict[str, str]
+    _closing: dict[str, str]  # closing brackets to be stripped along with their content, mapped to opening ones
+
+    def __init__(self, substitutions: bool, brackets: BracketStrategy) -> None:
+        data = get_data()
+        self._replacements = compile_substitutions(data.substitutions) if substitutions else {}
+        bracket_characters = {bracket for pair in data.inner_brackets for bracket in pair}
+        assert bracket_characters.isdisjoint(''.join(self._replacements) + ''.join(self._replacements.values()))
+        self._closing = {}
+        if brackets == BracketStrategy.EXPAND:
+            self._replacements.update((bracket, '') for bracket in bracket_characters)
+        elif brackets == BracketStrategy.STRIP:
+            self._closing = {closing: opening for opening, closing in data.inner_brackets}
+        tokens = sorted([*self._replacements, *self._closing, *self._closing.values()], key=len, reverse=True)
+        self._pattern = re.compile('|'.join(map(re.escape, tokens))) if tokens else None
+        self._initials = frozenset(token[0] for token in tokens)
+
+    def _replace(self, match: re.Match) -> str:
+        return self._replacements[match.group()]
+
+    def _strip(self, string: str) -> str:
+        assert self._pattern is not None
+        pieces: list[str] = []
+        opened: list[tuple[str, int]] = []  # opening brackets along with the number of pieces preceding them
+        position = 0
+        for match in self._pattern.finditer(string):
+            pieces.append(string[position:match.start()])
+            position = match.end()
+            token = match.group()
+            if token in self._replacements:
+                pieces.append(self._replacements[token])
+            elif token in self._closing:
+                if opened and opened[-1][0] == self._closing[token]:
+                    del pieces[opened.pop()[1]:]
+                else:
+                    opened.clear()  # Not stripping any content unless the brackets are well-balanced
+                    pieces.append(token)
+            else:
+                opened.append((token, len(pieces)))
+                pieces.append(token)
+        pieces.append(string[position:])
+        return ''.join(pieces)
+
+    def __call__(self, string: str) -> str:
+        if self._pattern is None or self._initials.isdisjoint(string):
+            return string
+        if self._closing:
+            return self._strip(string)
+        return self._pattern.sub(self._replace, string)
+
+
+def build_normalizers() -> dict[tuple[bool, BracketStrategy], Normalizer]:
+    return {
+        (substitutions, brackets): Normalizer(substitutions, brackets)
+        for substitutions in [False, True]
+        for brackets in BracketStrategy
+    }
+
+
+get_normalizers = with_cache(build_normalizers)
+
+
+class Pipeline:
+    """Normalization steps prepared for a particular configuration."""
+
+    _first: Normalizer
+    _sequences: CombinedSequences
+    _second: Optional[Normalizer]
+
+    def __init__(self, config: IPAConfig) -> None:
+        data = get_data()
+        normalizers = get_normalizers()
+        self._first = normalizers[config.substitutions, config.brackets]
+        self._sequences = CombinedSequences(config.combined, data.main_tie, data.ties)
+        # Second substitution pass, e.g., for ties inserted by combining
+        self._second = normalizers[True, BracketStrategy.KEEP] if config.substitutions else None
+
+    def __call__(self, string: str) -> str:
+        string = self._sequences.combine(self._first(decompose(string)))
+        return self._second(string) if self._second else string
+
+
+@with_memo('pipelines', PIPELINE_CACHE_SIZE)
+def get_pipeline(config: IPAConfig) -> Pipeline:
+    return Pipeline(config)
+
+
+def normalize(string: str, config: IPAConfig = IPAConfig()) -> str:
+    """Normalize a string the way it is done before parsing.
+
+    :param string: The string to normalize (like 'o(:)', with no enclosing brackets).
+    :param config: Normalization parameters (all of the parsing parameters are relevant).
+    :return: The string decomposed (NFD), with the substitutions performed, the brackets handled, and the ties inserted
+             as specified by `config`.
+    """
+    return get_pipeline(config)(string)
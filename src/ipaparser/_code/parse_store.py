@@ -0,0 +1,145 @@
+from __future__ import annotations
+import atexit
+from contextlib import suppress
+import marshal
+from os import PathLike
+import sqlite3
+from threading import Lock
+from typing import Any, ClassVar, Optional, Union
+
+from .cacher import with_memo
+from .data import get_data_fingerprint
+from .feature_helper import intern_feature_sets
+from .raw_symbol import RawSymbol
+from .snapshot import get_code_fingerprint
+
+__all__ = [
+    'ParseStore',
+    'use_persistent_cache',
+]
+
+FORMAT_VERSION = 2  # to be increased whenever the way results are stored changes
+WRITE_INTERVAL = 1 << 8  # new entries are written in batches, as committing each of them separately is slow
+TIMEOUT = 1.0  # seconds to wait for other processes holding a lock on the database
+STORED_SYMBOL_CACHE_SIZE = 1 << 12
+
+META_SCHEMA = 'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+RESULT_SCHEMA = ('CREATE TABLE parses (tied INTEGER NOT NULL, input TEXT NOT NULL, result BLOB NOT NULL,'
+                 ' PRIMARY KEY (tied, input)) WITHOUT ROWID')
+OBSOLETE_TABLES = ['parses', 'configs']  # including the ones earlier formats had
+
+
+def compute_fingerprint() -> str:
+    return f'{FORMAT_VERSION}/{marshal.version}/{get_code_fingerprint()}/{get_data_fingerprint()}'
+
+
+def to_serializable(symbol: RawSymbol) -> tuple[Any, ...]:
+    return (symbol.string, tuple(symbol.feature_sets),
+            None if symbol.components is None else tuple(map(to_serializable, symbol.components)))
+
+
+@with_memo('stored', STORED_SYMBOL_CACHE_SIZE)
+def from_serializable(serialized: tuple[Any, ...]) -> RawSymbol:
+    # Recurring symbols (most of them) are restored once rather than on every lookup
+    string, feature_sets, components = serialized
+    return RawSymbol(
+        string=string,
+        feature_sets=intern_feature_sets(feature_sets),
+        components=None if components is None else list(map(from_serializable, components)),
+    )
+
+
+class ParseStore:
+    """Parsing results kept in an SQLite database so that they are reused across runs (and shared between processes).
+
+    Results are keyed by the normalized input, so they are shared by all the configurations normalizing it identically.
+    The database records a fingerprint of the supporting data and of the library code; once it no longer matches,
+    all the stored results are dropped upon opening. No transaction is ever left open between calls (reading does not
+    start one, and new entries are buffered and then written in a single short transaction), so that processes sharing
+    the database do not wait for each other."""
+
+    active: ClassVar[Optional[ParseStore]] = None
+
+    _connection: sqlite3.Connection
+    _lock: Lock
+    _pending: dict[tuple[bool, str], bytes]  # entries not written to the database yet
+
+    def __init__(self, path: Union[str, PathLike]) -> None:
+        self._connection = sqlite3.connect(path, timeout=TIMEOUT, check_same_thread=False)
+        self._lock = Lock()
+        self._pending = {}
+        fingerprint = compute_fingerprint()
+        try:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            with self._connection:
+                self._connection.execute(META_SCHEMA)
+                stored = self._connection.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+                if stored is None or stored[0] != fingerprint:
+                    # Recreated rather than emptied, as the layout of the results may have changed as well
+                    for table in OBSOLETE_TABLES:
+                        self._connection.execute(f'DROP TABLE IF EXISTS {table}')
+                    self._connection.execute(RESULT_SCHEMA)
+                    self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def get(self, all_tied: bool, string: str) -> Optional[list[RawSymbol]]:
+        # The store is an optimization only, so any failure (e.g., another process locking the database for too long,
+        # or a damaged entry) is treated as a miss
+        try:
+            with self._lock:
+                if (result := self._pending.get((all_tied, string))) is None:
+                    row = self._connection.execute(
+                        'SELECT result FROM parses WHERE tied = ? AND input = ?',
+                        (all_tied, string),
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    result = row[0]
+            return list(map(from_serializable, marshal.loads(result)))
+        except (sqlite3.Error, EOFError, TypeError, ValueError):
+            return None
+
+    def put(self, all_tied: bool, string: str, symbols: list[RawSymbol]) -> None:
+        result = marshal.dumps(tuple(map(to_serializable, symbols)))
+        with self._lock:
+            self._pending[all_tied, string] = result
+            if len(self._pending) >= WRITE_INTERVAL:
+                self._write()
+
+    def _write(self) -> None:
+        pending, self._pending = self._pending, {}
+        with suppress(sqlite3.Error), self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO parses VALUES (?, ?, ?)',
+                                         [(all_tied, string, result) for (all_tied, string), result in pending.items()])
+
+    def flush(self) -> None:
+        """Write the entries stored so far to the database."""
+        with self._lock:
+            self._write()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+
+def use_persistent_cache(path: Optional[Union[str, PathLike]]) -> None:
+    """Keep parsing results in a database file so that they are reused across runs (and shared between processes).
+
+    Results stored by a different version of the library or for different supporting data are dropped automatically.
+
+    :param path: The database file (created if it does not exist), or None to stop using the persistent cache.
+    """
+    if previous := ParseStore.active:
+        ParseStore.active = None
+        previous.close()
+    if path is not None:
+        ParseStore.active = ParseStore(path)
+
+
+@atexit.register
+def close_active() -> None:
+    if store := ParseStore.active:
+        store.close()
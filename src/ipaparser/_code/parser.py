@@ -1,98 +1,226 @@
+from array import array
 from dataclasses import dataclass
-from typing import Optional
-
-from .combiner import apply_position, get_matcher, match_to_feature_sets
-from .data import get_data
-from .data_types import Symbol
-from .definitions import BracketStrategy
-from .features import FeatureSet
-from .ipa_config import IPAConfig
-from .matcher import Match
+from itertools import islice
+from typing import NamedTuple, Optional
+
+from .cacher import CacheInfo, register_cache, with_cache, with_memo, with_single_flight
+from .combiner import apply_position, get_matcher, get_modifiers, match_to_feature_sets
+from .data import get_data, get_data_fingerprint
+from .feature_helper import FeatureMask, intern_feature_sets
+from .normalizer import Pipeline
+from .parse_store import ParseStore
 from .phonetics import combine_feature_sets
+from .positions import PositionCodes, position_codes
 from .raw_symbol import RawSymbol
-from .strings import (
-    combine,
-    decompose,
-    expand_brackets,
-    perform_substitutions,
-    StringPositions,
-    strip_brackets,
-    to_positions,
-)
+from .snapshot import with_snapshot
+from .strings import StringPosition, StringPositions
 
 __all__ = [
     'parse',
+    'parse_normalized',
 ]
 
+SPAN_CACHE_SIZE = 1 << 14
+COMPONENT_CACHE_SIZE = 1 << 10
+POSITION_TABLE_SIZE = 1 << 14
+WORD_CACHE_SIZE = 1 << 12
+PARSE_CACHE_SIZE = 0  # whole inputs rarely recur in general, so caching them is opt-in
 
-@dataclass(frozen=True)
-class Segment:
+
+class Segment(NamedTuple):
+    # Segments only refer to positions by offsets; strings are extracted once a segment becomes a symbol
     start: int
     end: int
-    feature_sets: list[FeatureSet]
+    feature_sets: list[FeatureMask]
     components: Optional[list[RawSymbol]] = None
 
 
+@dataclass(frozen=True)
+class SpanData:
+    feature_sets: list[FeatureMask]
+    components: Optional[list[RawSymbol]]
+
+
+def expand(positions: StringPositions, segment: Segment, from_position: int, until_position: int) -> Segment:
+    feature_sets = segment.feature_sets
+
+    def iterate(initial: int, step: int, final: int) -> int:
+        nonlocal feature_sets
+        position = initial
+        while position != final and (next_feature_sets := apply_position(
+            position=positions[(next_position := position + step)],
+            feature_sets=feature_sets,
+            is_preceding=step < 0,
+        )):
+            position = next_position
+            feature_sets = next_feature_sets
+        return position
+
+    start = iterate(segment.start, -1, from_position)
+    end = iterate(segment.end - 1, 1, until_position - 1) + 1
+    return Segment(start, end, feature_sets, segment.components)
+
+
+@with_memo('components', COMPONENT_CACHE_SIZE)
+def get_components(string: str) -> list[RawSymbol]:
+    return Parser(string).parse()
+
+
+@with_memo('spans', SPAN_CACHE_SIZE)
+def get_span_data(span: StringPositions) -> Optional[SpanData]:
+    # Everything about a matched (tie-free) span is independent of its surroundings, so results are shared between all
+    # occurrences of the span; the lists returned are never mutated
+    matcher = get_matcher()
+    if not (match := matcher.match(span, 0, len(span))):
+        return None
+    feature_sets = match_to_feature_sets(match)
+    for submatch_length in range(match.length - 1, 0, -1):
+        for submatch_start in range(match.length - submatch_length + 1):
+            if submatch := matcher.match(span, submatch_start, submatch_length):
+                submatch_end = submatch_start + submatch_length
+                expanded = expand(span, Segment(submatch_start, submatch_end, match_to_feature_sets(submatch)),
+                                  0, match.length)
+                if expanded.start == 0 and expanded.end == match.length:
+                    feature_sets.extend(expanded.feature_sets)
+    return SpanData(
+        feature_sets=feature_sets,
+        components=None if feature_sets else get_components(match.primary_option.data.string),
+    )
+
+
+def is_terminal(position: StringPosition) -> bool:
+    return get_matcher().is_terminal(position[0])
+
+
+@with_snapshot('terminals', get_data_fingerprint)
+def collect_terminal_span_data() -> dict[StringPosition, SpanData]:
+    span_data: dict[StringPosition, SpanData] = {}
+    for position in get_matcher().terminal_positions():
+        if len(span_data) < POSITION_TABLE_SIZE and is_terminal(position) and (data := get_span_data((position,))):
+            span_data[position] = data
+    return span_data
+
+
+get_terminal_span_data = with_cache(collect_terminal_span_data)
+
+
+class PositionTable:
+    """Direct lookup of span data for single positions that cannot start a match longer than one position."""
+
+    _data: Optional[dict[StringPosition, SpanData]]  # filled upon first use
+    _maxsize: int
+    _hits: int
+    _misses: int
+
+    def __init__(self, maxsize: int) -> None:
+        self.resize(maxsize)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def _get_data(self) -> dict[StringPosition, SpanData]:
+        if self._data is None:
+            # Starts off with the positions known from the data, which are collected in advance
+            self._data = dict(islice(get_terminal_span_data().items(), self._maxsize))
+        return self._data
+
+    def get(self, position: StringPosition) -> Optional[SpanData]:
+        if (span_data := self._get_data().get(position)) is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return span_data
+
+    def add(self, position: StringPosition) -> None:
+        data = self._get_data()
+        if len(data) < self._maxsize and is_terminal(position) and (span_data := get_span_data((position,))):
+            data[position] = span_data
+
+    def resize(self, maxsize: int) -> None:
+        self._maxsize = max(maxsize, 0)
+        self.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data or ()))
+
+    def clear(self) -> None:
+        self._data = None
+        self._hits = 0
+        self._misses = 0
+
+
+position_table = register_cache('position_table', PositionTable(POSITION_TABLE_SIZE))
+
+
+@with_snapshot('separators', get_data_fingerprint)
+def collect_separators() -> frozenset[StringPosition]:
+    # Breaks that are always parsed on their own: they can neither be a part of a longer symbol, nor modify their
+    # neighbours, nor be modified by them (whether they are tied to their neighbours depends on the input)
+    matcher = get_matcher()
+    modifiers = get_modifiers()
+    inner_characters = matcher.inner_characters()
+    separators: set[StringPosition] = set()
+    for symbol in get_data().breaks:
+        character = symbol.string
+        if (len(character) == 1
+                and matcher.is_terminal(character)
+                and character not in inner_characters
+                and not any(character in characters for characters in modifiers.values())
+                and (span_data := get_span_data((character,)))
+                and not any(apply_position(modifier, span_data.feature_sets, is_preceding=is_preceding)
+                            for is_preceding, characters in modifiers.items()
+                            for modifier in characters)):
+            separators.add(character)
+    return frozenset(separators)
+
+
+get_separators = with_cache(collect_separators)
+
+
+@with_memo('words', WORD_CACHE_SIZE)
+def get_word(string: str) -> list[RawSymbol]:
+    return Parser(string).parse()
+
+
 class Parser:
-    _positions: StringPositions
+    _position_codes: PositionCodes
+    _codes: array
     _tie_free: StringPositions
     _total: int
     _all_tied: bool
 
     def __init__(self, string: str, *, all_tied: bool = False) -> None:
-        self._positions = to_positions(string)
-        ties = get_data().ties
-        self._tie_free = tuple(''.join(character
-                                       for index, character in enumerate(position)
-                                       if index == 0 or character not in ties)
-                               for position in self._positions)
-        self._total = len(self._positions)
+        self._position_codes = position_codes.current()
+        self._codes = self._position_codes.encode(string)
+        self._tie_free = tuple(map(self._position_codes.tie_free.__getitem__, self._codes))
+        self._total = len(self._codes)
         self._all_tied = all_tied
 
     def _extract(self, start: int, end: int, *, omit_final_tie: bool = False) -> str:
-        return ''.join((self._tie_free if omit_final_tie and position == end - 1 else self._positions)[position]
-                       for position in range(max(start, 0), min(end, self._total)))
+        start, end = max(start, 0), min(end, self._total)
+        strings = self._position_codes.strings
+        if omit_final_tie and start < end:
+            return ''.join([strings[code] for code in self._codes[start:end - 1]]) + self._tie_free[end - 1]
+        return ''.join([strings[code] for code in self._codes[start:end]])
 
     def _is_tied(self, position: int) -> bool:
         return ((self._all_tied and position < self._total - 1)
-                or len(self._tie_free[position]) < len(self._positions[position]))
+                or bool(self._position_codes.tied[self._codes[position]]))
 
     def _expand(self, segment: Segment, from_position: int, until_position: int) -> Segment:
-        feature_sets = segment.feature_sets
-
-        def iterate(initial: int, step: int, final: int) -> int:
-            nonlocal feature_sets
-            position = initial
-            while position != final and (next_feature_sets := apply_position(
-                position=self._tie_free[(next_position := position + step)],
-                feature_sets=feature_sets,
-                is_preceding=step < 0,
-            )):
-                position = next_position
-                feature_sets = next_feature_sets
-            return position
-
-        start = iterate(segment.start, -1, from_position)
-        end = iterate(segment.end - 1, 1, until_position - 1) + 1
-        return Segment(start, end, feature_sets, segment.components)
-
-    def _match(self, start: int, length: Optional[int] = None) -> Optional[Match[Symbol]]:
-        return get_matcher().match(self._tie_free, start, length)
+        return expand(self._tie_free, segment, from_position, until_position)
 
     def _get_segment_at(self, start: int) -> Optional[Segment]:
-        if match := self._match(start):
+        if span_data := position_table.get(self._tie_free[start]):
+            return Segment(start, start + 1, span_data.feature_sets, span_data.components)
+        if match := get_matcher().match(self._tie_free, start):
             end = start + match.length
-            feature_sets = match_to_feature_sets(match)
-            for submatch_length in range(match.length - 1, 0, -1):
-                for submatch_start in range(start, start + match.length - submatch_length + 1):
-                    if submatch := self._match(submatch_start, submatch_length):
-                        submatch_end = submatch_start + submatch_length
-                        expanded = self._expand(Segment(submatch_start, submatch_end, match_to_feature_sets(submatch)),
-                                                start, end)
-                        if expanded.start == start and expanded.end == end:
-                            feature_sets.extend(expanded.feature_sets)
-            return Segment(start, end, feature_sets,
-                           components=None if feature_sets else Parser(match.primary_option.data.string).parse())
+            if match.length == 1:
+                position_table.add(self._tie_free[start])
+            span_data = get_span_data(self._tie_free[start:end])
+            assert span_data is not None
+            return Segment(start, end, span_data.feature_sets, span_data.components)
         else:
             return None
 
@@ -132,7 +260,7 @@ class Parser:
     def _segment_to_symbol(self, segment: Segment, *, is_component: bool = False) -> RawSymbol:
         return RawSymbol(
             string=self._extract(segment.start, segment.end, omit_final_tie=is_component),
-            feature_sets=segment.feature_sets,
+            feature_sets=intern_feature_sets(tuple(segment.feature_sets)),
             components=segment.components,
         )
 
@@ -151,6 +279,22 @@ class Parser:
                 result.append(group[0])
         return result
 
+    def parse_words(self) -> list[RawSymbol]:
+        """Parse the string word by word (splitting it at untied separators), memoizing the results for words."""
+        separators = get_separators()
+        strings, tied = self._position_codes.strings, self._position_codes.tied
+        symbols: list[RawSymbol] = []
+        start = 0
+        for position, code in enumerate(self._codes):
+            if strings[code] in separators and not (position > 0 and tied[self._codes[position - 1]]):
+                if start < position:
+                    symbols.extend(get_word(self._extract(start, position)))
+                symbols.extend(get_word(strings[code]))
+                start = position + 1
+        if start < self._total:
+            symbols.extend(get_word(self._extract(start, self._total)))
+        return symbols
+
     def parse(self) -> list[RawSymbol]:
         symbols: list[RawSymbol] = []
         segments = self._expand_all(self._tie(self._group(self._expand_all(self._get_initial_segments()))))
@@ -178,20 +322,20 @@ class Parser:
         return symbols
 
 
-def normalize(string: str, config: IPAConfig) -> str:
-    data = get_data()
-    string = decompose(string)
-    if config.substitutions:
-        string = perform_substitutions(string, data.substitutions)  # first pass
-    if config.brackets == BracketStrategy.EXPAND:
-        string = expand_brackets(string, data.inner_brackets)
-    elif config.brackets == BracketStrategy.STRIP:
-        string = strip_brackets(string, data.inner_brackets)
-    string = combine(string, config.combined, data.main_tie, data.ties)
-    if config.substitutions:
-        string = perform_substitutions(string, data.substitutions)  # second pass
-    return string
+@with_memo('parses', PARSE_CACHE_SIZE)
+@with_single_flight('parses')
+def parse_normalized(string: str, *, all_tied: bool = False) -> list[RawSymbol]:
+    # Keyed by the normalized input only, so that configurations normalizing it identically share the result; the
+    # symbols returned are shared and never mutated, which also lets concurrent identical calls wait for one of them
+    # instead of each doing the same work
+    if (store := ParseStore.active) and (stored := store.get(all_tied, string)) is not None:
+        return stored
+    parser = Parser(string, all_tied=all_tied)
+    symbols = parser.parse_words() if get_word.maxsize and not all_tied else parser.parse()
+    if store:
+        store.put(all_tied, string, symbols)
+    return symbols
 
 
-def parse(string: str, config: IPAConfig, *, all_tied: bool = False) -> list[RawSymbol]:
-    return Parser(normalize(string, config), all_tied=all_tied).parse()
+def parse(string: str, pipeline: Pipeline, *, all_tied: bool = False) -> list[RawSymbol]:
+    return parse_normalized(pipeline(string), all_tied=all_tied)
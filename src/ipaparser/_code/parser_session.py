@@ -0,0 +1,74 @@
+from typing import Iterable
+
+from .ipa import IPA, transcription_from_pipeline
+from .ipa_config import IPAConfig
+from .ipa_symbol import IPASymbol
+from .normalizer import Pipeline
+from .parse_store import ParseStore
+
+__all__ = [
+    'ParserSession',
+]
+
+
+class ParserSession:
+    """Parser for a fixed configuration, which is prepared once instead of on every call."""
+
+    _config: IPAConfig
+    _pipeline: Pipeline
+
+    @property
+    def config(self) -> IPAConfig:
+        """Parameters the session parses with."""
+        return self._config
+
+    def __init__(self, config: IPAConfig = IPAConfig()) -> None:
+        """Prepare parsing with particular parameters.
+
+        :param config: Parsing parameters.
+        """
+        self._config = config
+        self._pipeline = Pipeline(config)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self._config)})'
+
+    def normalize(self, string: str) -> str:
+        """Normalize a string the way it is done before parsing (see `normalize`)."""
+        return self._pipeline(string)
+
+    def parse(self, transcription: str) -> IPA:
+        """Parse a (properly enclosed) transcription string (see `IPA`).
+
+        :raises:
+            EnclosingError: The input string is not properly enclosed in brackets (like [so] or /so/).
+        """
+        return transcription_from_pipeline(transcription, self._pipeline)
+
+    def parse_symbol(self, string: str) -> IPASymbol:
+        """Parse a single sound or auxiliary IPA symbol (see `IPASymbol`)."""
+        return IPASymbol(string, self._config)
+
+    def parse_many(self, transcriptions: Iterable[str]) -> list[IPA]:
+        """Parse a number of (properly enclosed) transcription strings (see `IPA`).
+
+        :raises:
+            EnclosingError: Some of the input strings are not properly enclosed in brackets (like [so] or /so/).
+        """
+        return [transcription_from_pipeline(transcription, self._pipeline) for transcription in transcriptions]
+
+    def warm_up(self, transcriptions: Iterable[str]) -> None:
+        """Parse transcriptions in advance so that parsing them later is served by the caches (the persistent one
+        included, see `use_persistent_cache`).
+
+        :param transcriptions: (Properly enclosed) transcription strings, such as the ones from a frequency list, from
+                               the most to the least frequent.
+        :raises:
+            EnclosingError: Some of the input strings are not properly enclosed in brackets (like [so] or /so/).
+        """
+        # Going from the end of the list, so that the most frequent transcriptions are the ones used most recently
+        # and thus retained by the bounded in-memory caches
+        for transcription in reversed(list(transcriptions)):
+            transcription_from_pipeline(transcription, self._pipeline)
+        if store := ParseStore.active:
+            store.flush()
@@ -1,9 +1,9 @@
 from itertools import product
+from typing import Callable, Optional
 
-from .feature_helper import equivalent, extend, include
+from .cacher import with_memo
+from .feature_helper import extend, FEATURE_MASKS, FeatureMask, KIND_MASKS, to_mask
 from .features import (
-    Feature,
-    FeatureSet,
     Manner,
     Place,
     PlaceCategory,
@@ -17,106 +17,137 @@ __all__ = [
     'combine_feature_sets',
 ]
 
-
-def combine_affricate(left: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
-    def matching_places(left_places: FeatureSet, right_places: FeatureSet) -> bool:
-        return left_places == right_places or (left_places, right_places) in [({Place.ALVEOLAR}, {Place.PALATAL}),
-                                                                              ({Place.BILABIAL}, {Place.LABIODENTAL})]
-
-    if (include({SoundSubtype, Manner}, left) - {Manner.EJECTIVE} == {SoundSubtype.SIMPLE_CONSONANT, Manner.STOP}
-            and Manner.FRICATIVE in right
-            and equivalent({SoundSubtype, Manner, Voicing},
-                           left - {Manner.STOP, Manner.EJECTIVE},
-                           right - {Manner.FRICATIVE, Manner.SIBILANT, Manner.LATERAL, Manner.EJECTIVE})
-            and matching_places(*(include({Place}, side) for side in (left, right)))):
-        return [((left | right | {Manner.AFFRICATE})
-                 - {Manner.STOP, Manner.FRICATIVE})]
+COMBINATION_CACHE_SIZE = 1 << 12
+
+MANNER = KIND_MASKS[Manner]
+PLACE = KIND_MASKS[Place]
+PLACE_CATEGORY = KIND_MASKS[PlaceCategory]
+SOUND_SUBTYPE = KIND_MASKS[SoundSubtype]
+VOICING = KIND_MASKS[Voicing]
+
+AFFRICATE = FEATURE_MASKS[Manner.AFFRICATE]
+CLICK = FEATURE_MASKS[Manner.CLICK]
+EJECTIVE = FEATURE_MASKS[Manner.EJECTIVE]
+FRICATIVE = FEATURE_MASKS[Manner.FRICATIVE]
+STOP = FEATURE_MASKS[Manner.STOP]
+UVULAR = FEATURE_MASKS[Place.UVULAR]
+SIMPLE_CONSONANT = FEATURE_MASKS[SoundSubtype.SIMPLE_CONSONANT]
+SIMPLE_VOWEL = FEATURE_MASKS[SoundSubtype.SIMPLE_VOWEL]
+
+
+def combine_affricate(left: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
+    def matching_places(left_places: FeatureMask, right_places: FeatureMask) -> bool:
+        return left_places == right_places or (left_places, right_places) in [
+            (FEATURE_MASKS[Place.ALVEOLAR], FEATURE_MASKS[Place.PALATAL]),
+            (FEATURE_MASKS[Place.BILABIAL], FEATURE_MASKS[Place.LABIODENTAL]),
+        ]
+
+    kinds = SOUND_SUBTYPE | MANNER | VOICING
+    if (left & (SOUND_SUBTYPE | MANNER) & ~EJECTIVE == SIMPLE_CONSONANT | STOP
+            and right & FRICATIVE
+            and (left & ~(STOP | EJECTIVE) & kinds
+                 == right & ~to_mask({Manner.FRICATIVE, Manner.SIBILANT, Manner.LATERAL, Manner.EJECTIVE}) & kinds)
+            and matching_places(left & PLACE, right & PLACE)):
+        return [(left | right | AFFRICATE) & ~(STOP | FRICATIVE)]
     else:
         return []
 
 
-def combine_doubly_articulated(left: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
-    if (include({SoundSubtype}, left) == {SoundSubtype.SIMPLE_CONSONANT}
-            and equivalent({SoundSubtype, Manner, Voicing},
-                           left - {Manner.EJECTIVE},
-                           right - {Manner.EJECTIVE})
-            and not equivalent({PlaceCategory}, left, right)):
-        return [((left | right | {SoundSubtype.DOUBLY_ARTICULATED_CONSONANT})
-                 - {SoundSubtype.SIMPLE_CONSONANT})]
+def combine_doubly_articulated(left: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
+    kinds = SOUND_SUBTYPE | MANNER | VOICING
+    if (left & SOUND_SUBTYPE == SIMPLE_CONSONANT
+            and left & ~EJECTIVE & kinds == right & ~EJECTIVE & kinds
+            and left & PLACE_CATEGORY != right & PLACE_CATEGORY):
+        return [(left | right | FEATURE_MASKS[SoundSubtype.DOUBLY_ARTICULATED_CONSONANT]) & ~SIMPLE_CONSONANT]
     else:
         return []
 
 
-def combine_contour_click(left: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
-    if (include({SoundSubtype}, left) == {SoundSubtype.SIMPLE_CONSONANT}
-            and Manner.CLICK in left
-            and include({SoundSubtype, Place}, right) == {SoundSubtype.SIMPLE_CONSONANT, Place.UVULAR}):
-        manners: dict[FeatureSet, Feature] = {
-            frozenset({Manner.STOP}): Manner.STOP,
-            frozenset({Manner.FRICATIVE}): Manner.AFFRICATE,
+def combine_contour_click(left: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
+    if (left & SOUND_SUBTYPE == SIMPLE_CONSONANT
+            and left & CLICK
+            and right & (SOUND_SUBTYPE | PLACE) == SIMPLE_CONSONANT | UVULAR):
+        manners: dict[FeatureMask, FeatureMask] = {
+            STOP: STOP,
+            FRICATIVE: AFFRICATE,
         }
-        if (right_manner := include({Manner}, right - {Manner.EJECTIVE})) in manners:
-            return [((left | (right - right_manner) | {SoundSubtype.CONTOUR_CLICK, manners[right_manner]})
-                     - {SoundSubtype.SIMPLE_CONSONANT})]
+        if (right_manner := right & ~EJECTIVE & MANNER) in manners:
+            return [(left | (right & ~right_manner) | FEATURE_MASKS[SoundSubtype.CONTOUR_CLICK] | manners[right_manner])
+                    & ~SIMPLE_CONSONANT]
     return []
 
 
-def combine_prenasalized(left: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
-    base_extended = extend(include({Place}, right) | {SoundSubtype.SIMPLE_CONSONANT, Manner.NASAL})
+def combine_prenasalized(left: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
+    base_extended = extend(right & PLACE | SIMPLE_CONSONANT | FEATURE_MASKS[Manner.NASAL])
     if left == base_extended:
-        return [right | {SecondaryModifier.PRENASALIZED, SecondaryModifier.VOICELESSLY_PRENASALIZED}]
-    elif left == base_extended | Voicing.VOICED.extend():
-        return [right | {SecondaryModifier.PRENASALIZED}]
+        return [right | to_mask({SecondaryModifier.PRENASALIZED, SecondaryModifier.VOICELESSLY_PRENASALIZED})]
+    elif left == base_extended | extend(FEATURE_MASKS[Voicing.VOICED]):
+        return [right | FEATURE_MASKS[SecondaryModifier.PRENASALIZED]]
     else:
         return []
 
 
-def combine_polyphthong(subtype: SoundSubtype, *feature_sets: FeatureSet) -> list[FeatureSet]:
-    weak_syllabicity = {Syllabicity.NONSYLLABIC, Syllabicity.ANAPTYCTIC}
-    if (all(include({SoundSubtype}, features) == {SoundSubtype.SIMPLE_VOWEL} for features in feature_sets)
-            and any(features.isdisjoint(weak_syllabicity) for features in feature_sets)):
-        return [((frozenset().union(*feature_sets) | {subtype})
-                 - {SoundSubtype.SIMPLE_VOWEL} - weak_syllabicity)]
+def combine_polyphthong(subtype: SoundSubtype, *feature_sets: FeatureMask) -> list[FeatureMask]:
+    weak_syllabicity = to_mask({Syllabicity.NONSYLLABIC, Syllabicity.ANAPTYCTIC})
+    if (all(features & SOUND_SUBTYPE == SIMPLE_VOWEL for features in feature_sets)
+            and any(not features & weak_syllabicity for features in feature_sets)):
+        combined = 0
+        for features in feature_sets:
+            combined |= features
+        return [(combined | FEATURE_MASKS[subtype]) & ~SIMPLE_VOWEL & ~weak_syllabicity]
     else:
         return []
 
 
-def combine_diphthong(left: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
+def combine_diphthong(left: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
     return combine_polyphthong(SoundSubtype.DIPHTHONG, left, right)
 
 
-def combine_triphthong(left: FeatureSet, middle: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
+def combine_triphthong(left: FeatureMask, middle: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
     return combine_polyphthong(SoundSubtype.TRIPHTHONG, left, middle, right)
 
 
-def combine_triple_left_to_right(left: FeatureSet, middle: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
+def combine_triple_left_to_right(left: FeatureMask, middle: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
     return combine_feature_sets(combine_feature_sets([left], [middle]), [right])
 
 
-def combine_triple_right_to_left(left: FeatureSet, middle: FeatureSet, right: FeatureSet) -> list[FeatureSet]:
+def combine_triple_right_to_left(left: FeatureMask, middle: FeatureMask, right: FeatureMask) -> list[FeatureMask]:
     return combine_feature_sets([left], combine_feature_sets([middle], [right]))
 
 
-COMBINERS = {
+Combiner = Callable[..., list[FeatureMask]]
+
+COMBINERS: dict[int, list[tuple[Combiner, tuple[Optional[FeatureMask], ...]]]] = {
+    # Each combiner is accompanied by the sound subtypes its arguments must have in order to be combined (if any)
     2: [
-        combine_affricate,
-        combine_diphthong,
-        combine_doubly_articulated,
-        combine_contour_click,
-        combine_prenasalized,
+        (combine_affricate, (SIMPLE_CONSONANT, SIMPLE_CONSONANT)),
+        (combine_diphthong, (SIMPLE_VOWEL, SIMPLE_VOWEL)),
+        (combine_doubly_articulated, (SIMPLE_CONSONANT, SIMPLE_CONSONANT)),
+        (combine_contour_click, (SIMPLE_CONSONANT, SIMPLE_CONSONANT)),
+        (combine_prenasalized, (SIMPLE_CONSONANT, None)),
     ],
     3: [
-        combine_triphthong,
-        combine_triple_left_to_right,
-        combine_triple_right_to_left,
+        (combine_triphthong, (SIMPLE_VOWEL, SIMPLE_VOWEL, SIMPLE_VOWEL)),
+        (combine_triple_left_to_right, (None, None, None)),
+        (combine_triple_right_to_left, (None, None, None)),
     ],
 }
 
 
-def combine_feature_sets(*feature_sets: list[FeatureSet]) -> list[FeatureSet]:
-    if len(feature_sets) <= 1:
-        raise ValueError(f'There should be at least two lists of feature sets to combine (got {len(feature_sets)})')
+@with_memo('combinations', COMBINATION_CACHE_SIZE)
+def combine_interpretations(feature_sets: tuple[tuple[FeatureMask, ...], ...]) -> list[FeatureMask]:
     return [features
-            for combiner in COMBINERS.get(len(feature_sets), [])
-            for interpretation in product(*feature_sets)
+            for combiner, subtypes in COMBINERS.get(len(feature_sets), [])
+            for interpretation in product(*(
+                [option for option in options if subtype is None or option & subtype]
+                for options, subtype in zip(feature_sets, subtypes)
+            ))
             for features in combiner(*interpretation)]
+
+
+def combine_feature_sets(*feature_sets: list[FeatureMask]) -> list[FeatureMask]:
+    if len(feature_sets) <= 1:
+        raise ValueError(f'There should be at least two lists of feature sets to combine (got {len(feature_sets)})')
+    if len(feature_sets) not in COMBINERS or not all(feature_sets):
+        return []  # nothing could be combined, so no (possibly long) cache key is built either
+    return combine_interpretations(tuple(map(tuple, feature_sets)))
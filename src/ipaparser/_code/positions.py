@@ -0,0 +1,100 @@
+from array import array
+from threading import Lock
+from typing import Optional
+
+from .cacher import CacheInfo, register_cache
+from .data import get_data
+from .strings import StringPosition, to_positions
+
+__all__ = [
+    'PositionCodes',
+    'position_codes',
+]
+
+POSITION_CODE_LIMIT = 1 << 16
+
+
+class PositionCodes:
+    """Interned string positions addressed by integer codes, along with their tie-free forms and tie flags.
+
+    Codes are only meaningful within the table that assigned them; parsers keep a reference to the table they use."""
+
+    strings: list[StringPosition]
+    tie_free: list[StringPosition]
+    tied: bytearray
+    lookups: int  # positions encoded, including the ones added
+    _codes: dict[StringPosition, int]
+    _lock: Lock
+
+    def __init__(self) -> None:
+        self.strings = []
+        self.tie_free = []
+        self.tied = bytearray()
+        self.lookups = 0
+        self._codes = {}
+        self._lock = Lock()
+
+    def _add(self, position: StringPosition) -> int:
+        with self._lock:
+            if (code := self._codes.get(position)) is None:
+                ties = get_data().ties
+                tie_free = ''.join(character for index, character in enumerate(position)
+                                   if index == 0 or character not in ties)
+                code = len(self.strings)
+                self.strings.append(position)
+                self.tie_free.append(tie_free)
+                self.tied.append(len(tie_free) < len(position))
+                self._codes[position] = code
+            return code
+
+    def encode(self, string: str) -> array:
+        codes = self._codes
+        encoded = array('I', [codes[position] if position in codes else self._add(position)
+                              for position in to_positions(string)])
+        self.lookups += len(encoded)
+        return encoded
+
+
+class PositionCodeCache:
+    """The position code table in use. Once it is full, a fresh one is started, so that adversarial inputs cannot grow
+    the interned data without bound."""
+
+    _current: Optional[PositionCodes]
+    _maxsize: int
+    _retired_lookups: int  # statistics of the tables replaced since the cache was last cleared
+    _retired_size: int
+
+    def __init__(self, maxsize: int) -> None:
+        self.resize(maxsize)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def current(self) -> PositionCodes:
+        if (current := self._current) is None or len(current.strings) >= self._maxsize:
+            if current is not None:
+                self._retired_lookups += current.lookups
+                self._retired_size += len(current.strings)
+            current = self._current = PositionCodes()
+        return current
+
+    def resize(self, maxsize: int) -> None:
+        self._maxsize = max(maxsize, 0)
+        self.clear()
+
+    def info(self) -> CacheInfo:
+        lookups, misses, size = self._retired_lookups, self._retired_size, 0
+        if current := self._current:
+            size = len(current.strings)
+            lookups += current.lookups
+            misses += size
+        return CacheInfo(lookups - misses, misses, self._maxsize, size)
+
+    def clear(self) -> None:
+        self._current = None
+        self._retired_lookups = 0
+        self._retired_size = 0
+
+
+position_codes = register_cache('position_codes', PositionCodeCache(POSITION_CODE_LIMIT))
@@ -1,16 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional
+from typing import NamedTuple, Optional
 
-from .features import FeatureSet
+from .feature_helper import FeatureMask
 
 __all__ = [
     'RawSymbol',
 ]
 
 
-@dataclass(frozen=True)
-class RawSymbol:
+class RawSymbol(NamedTuple):
     string: str
-    feature_sets: list[FeatureSet]
+    feature_sets: list[FeatureMask]
     components: Optional[list[RawSymbol]] = None
@@ -0,0 +1,67 @@
+from hashlib import sha256
+import os
+from pathlib import Path
+import pickle
+from typing import Callable, TypeVar
+
+from .cacher import with_cache
+from .disk_cache import get_directory, read_cache, write_cache
+
+__all__ = [
+    'fingerprint_files',
+    'get_code_fingerprint',
+    'with_snapshot',
+]
+
+T = TypeVar('T')
+
+SNAPSHOT_PREFIX = 'snapshot'
+CODE_DIRECTORY = Path(__file__).parent
+
+
+def fingerprint_files(directory: Path, suffix: str = '') -> str:
+    # The sizes and modification times of the files stand in for their contents, since reading and hashing all of them
+    # on every start takes a while
+    digest = sha256()
+    for root, subdirectories, files in os.walk(directory):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.endswith(suffix):
+                status = os.stat(path := os.path.join(root, name))
+                relative = os.path.relpath(path, directory).replace(os.sep, '/')
+                digest.update(f'{relative}\0{status.st_size}\0{status.st_mtime_ns}\0'.encode())
+    return digest.hexdigest()
+
+
+def compute_code_fingerprint() -> str:
+    # Changes whenever the layout of the objects built by the code may change
+    return fingerprint_files(CODE_DIRECTORY, '.py')
+
+
+get_code_fingerprint = with_cache(compute_code_fingerprint)
+
+
+def with_snapshot(name: str, fingerprint: Callable[[], str]) -> Callable[[Callable[[], T]], Callable[[], T]]:
+    """Make a loader keep its result on disk, so that it is only computed anew once the fingerprint or the code change.
+
+    The snapshot is keyed by the module path as well, since the same code may be imported under different names."""
+
+    def decorate(loader: Callable[[], T]) -> Callable[[], T]:
+        def load() -> T:
+            if get_directory() is None:  # no point in serializing the result then
+                return loader()
+            key = '\0'.join([name, __name__, str(pickle.HIGHEST_PROTOCOL), get_code_fingerprint(), fingerprint()])
+            prefix = f'{SNAPSHOT_PREFIX}-{name}-'
+            file = f'{prefix}{sha256(key.encode()).hexdigest()[:32]}.pickle'
+            if (cached := read_cache(file)) is not None:
+                try:
+                    return pickle.loads(cached)
+                except Exception:  # a damaged snapshot can fail in all sorts of ways; it is regenerated then
+                    pass
+            result = loader()
+            write_cache(file, pickle.dumps(result, pickle.HIGHEST_PROTOCOL), replaces=prefix)
+            return result
+
+        return load
+
+    return decorate
@@ -1,22 +1,25 @@
-from dataclasses import dataclass
+import re
+from typing import Optional, Pattern
 import unicodedata
 
-from .data_types import InnerBracketData, SubstitutionData
+from .automaton import Automaton
+from .cacher import with_cache
+from .combining_ranges import COMBINING_RANGES
+from .data_types import SubstitutionData
 
 __all__ = [
-    'combine',
+    'CombinedSequences',
     'decompose',
-    'expand_brackets',
     'is_decomposed',
     'perform_substitutions',
     'StringPosition',
     'StringPositions',
-    'strip_brackets',
     'to_positions',
     'to_string',
 ]
 
 DECOMPOSED_FORM = 'NFD'
+AUTOMATON_THRESHOLD = 8  # shorter lists of combined sequences are searched for one by one
 
 StringPosition = str
 StringPositions = tuple[StringPosition, ...]
@@ -24,15 +27,34 @@ StringPositions = tuple[StringPosition, ...]
 # initial one, which might start with a combining character if such an input is provided by the user)
 
 
+def is_decomposed(string: str) -> bool:
+    return unicodedata.is_normalized(DECOMPOSED_FORM, string)
+
+
 def decompose(string: str) -> str:
+    if string.isascii() or is_decomposed(string):
+        return string
     return unicodedata.normalize(DECOMPOSED_FORM, string)
 
 
-def is_decomposed(string: str) -> bool:
-    return unicodedata.is_normalized(DECOMPOSED_FORM, string)
+def build_position_pattern() -> Optional[Pattern[str]]:
+    # Built from a table generated in advance, as scanning all the code points for combining ones takes a while; with
+    # no table for the Unicode version in use, combining characters are looked up one by one instead
+    if (ranges := COMBINING_RANGES.get(unicodedata.unidata_version)) is None:
+        return None
+    combining = ''.join(re.escape(chr(first)) + (f'-{re.escape(chr(last))}' if last > first else '')
+                        for first, last in ranges)
+    return re.compile(f'.[{combining}]*', re.DOTALL)
+
+
+get_position_pattern = with_cache(build_position_pattern)
 
 
 def to_positions(string: str) -> StringPositions:
+    if string.isascii():  # no combining characters
+        return tuple(string)
+    if pattern := get_position_pattern():
+        return tuple(pattern.findall(string))
     start_indices = [index for index in range(len(string)) if index == 0 or not unicodedata.combining(string[index])]
     return tuple(string[start:end] for start, end in zip(start_indices, start_indices[1:] + [len(string)]))
 
@@ -47,47 +69,6 @@ def perform_substitutions(string: str, substitutions: SubstitutionData) -> str:
     return string
 
 
-def expand_brackets(string: str, brackets: InnerBracketData) -> str:
-    for left, right in brackets:
-        string = string.replace(left, '').replace(right, '')
-    return string
-
-
-@dataclass(frozen=True)
-class BracketData:
-    bracket: str
-    position: int
-
-
-def strip_brackets(string: str, brackets: InnerBracketData) -> str:
-    bracket_pairs = set(brackets)
-    opening = {bracket for bracket, _ in bracket_pairs}
-    closing = {bracket for _, bracket in bracket_pairs}
-    open_deltas = [0 for _ in string]
-    currently_open: list[BracketData] = []
-    for position, character in enumerate(string):
-        if character in opening:
-            currently_open.append(BracketData(
-                bracket=character,
-                position=position,
-            ))
-        elif character in closing:
-            if currently_open and (currently_open[-1].bracket, character) in bracket_pairs:
-                matched = currently_open.pop()
-                open_deltas[matched.position] = 1
-                open_deltas[position] = -1
-            else:
-                currently_open.clear()  # Not stripping any content unless the brackets are well-balanced
-    taken: list[str] = []
-    open_count = 0
-    for character, delta in zip(string, open_deltas):
-        open_count += max(delta, 0)
-        if open_count == 0:
-            taken.append(character)
-        open_count += min(delta, 0)
-    return ''.join(taken)
-
-
 def combine_single(string: str, sequence: tuple[str, ...], tie: str, ties: set[str]) -> str:
     if len(sequence) <= 1:
         raise ValueError(f'Attempt to combine a sequence of length {len(sequence)}')
@@ -124,7 +105,33 @@ def combine_single(string: str, sequence: tuple[str, ...], tie: str, ties: set[s
     return ''.join(sections)
 
 
-def combine(string: str, combined: tuple[tuple[str, ...]], tie: str, ties: set[str]) -> str:
-    for sequence in combined:
-        string = combine_single(string, sequence, tie, ties)
-    return string
+class CombinedSequences:
+    """Sequences of sounds to be connected with ties, prepared for finding them in strings."""
+
+    _combined: tuple[tuple[str, ...]]
+    _tie: str
+    _ties: set[str]
+    _keys: list[str]
+    _automaton: Optional[Automaton]
+
+    def __init__(self, combined: tuple[tuple[str, ...]], tie: str, ties: set[str]) -> None:
+        self._combined = combined
+        self._tie = tie
+        self._ties = ties
+        self._keys = [''.join(sequence).replace(tie, '') for sequence in combined]
+        self._automaton = Automaton(self._keys) if len(self._keys) >= AUTOMATON_THRESHOLD else None
+
+    def _find(self, string: str) -> list[int]:
+        # Ties are only ever inserted, so a sequence can be found in between the passes of `combine` only if it occurs
+        # in the original string when the inserted tie is disregarded
+        string = string.replace(self._tie, '')
+        if self._automaton is None:
+            return [index for index, key in enumerate(self._keys) if key in string]
+        return sorted(self._automaton.find(string))
+
+    def combine(self, string: str) -> str:
+        if not self._combined:
+            return string
+        for index in self._find(string):
+            string = combine_single(string, self._combined[index], self._tie, self._ties)
+        return string
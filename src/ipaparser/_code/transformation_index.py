@@ -0,0 +1,144 @@
+from typing import Iterator, Optional
+
+from .cacher import with_cache
+from .codegen import (
+    Applicability,
+    compile_functions,
+    FirstApplicable,
+    generate_applicability,
+    generate_first_applicable,
+)
+from .data import get_data
+from .data_types import ChangeSequence, Combining, CombiningData, Transformation
+from .feature_helper import FeatureMask
+
+__all__ = [
+    'get_transformation_index',
+    'TransformationIndex',
+]
+
+
+def interpret_applicability(transformations: list[Transformation]) -> Applicability:
+    def applicability(features: FeatureMask) -> list[int]:
+        return [index for index, transformation in enumerate(transformations)
+                if transformation.is_applicable(features)]
+
+    return applicability
+
+
+def interpret_first_applicable(transformations: list[Transformation]) -> FirstApplicable:
+    def first_applicable(features: FeatureMask) -> Optional[int]:
+        for index, transformation in enumerate(transformations):
+            if transformation.is_applicable(features):
+                return index
+        return None
+
+    return first_applicable
+
+
+class TransformationList:
+    """Transformations of a single combining character, indexed by the features their applicability depends on."""
+
+    _transformations: list[Transformation]
+    _applicability: Applicability
+    _dependencies: FeatureMask
+    _by_changes: dict[ChangeSequence, list[int]]
+    _applicable: dict[FeatureMask, list[int]]  # filled lazily, keyed by the relevant part of the features
+
+    def __init__(self, transformations: list[Transformation], applicability: Applicability) -> None:
+        self._transformations = transformations
+        self._applicability = applicability
+        self._dependencies = 0
+        self._by_changes = {}
+        for index, transformation in enumerate(transformations):
+            self._dependencies |= transformation.dependencies
+            self._by_changes.setdefault(transformation.changes, []).append(index)
+        self._applicable = {}
+
+    def _get_applicable(self, features: FeatureMask) -> list[int]:
+        signature = features & self._dependencies
+        if (applicable := self._applicable.get(signature)) is None:
+            applicable = self._applicability(signature)
+            self._applicable[signature] = applicable
+        return applicable
+
+    def find(self, features: FeatureMask, allowed: Optional[set[ChangeSequence]],
+             disallowed: Optional[set[ChangeSequence]]) -> Optional[Transformation]:
+        """Return the first transformation that is either applicable or allowed, and not disallowed."""
+        candidates = self._get_applicable(features)
+        if allowed:
+            candidates = sorted(set(candidates).union(*(self._by_changes.get(changes, []) for changes in allowed)))
+        for index in candidates:
+            transformation = self._transformations[index]
+            if not disallowed or transformation.changes not in disallowed:
+                return transformation
+        return None
+
+
+class TransformationIndex:
+    """Compiled lookup of transformations by combining character (and of meta transformations by requirements).
+
+    Applicability checks are generated as specialized Python code unless `compiled` is False, in which case the
+    transformations are interpreted (which is meant for verifying the generated code)."""
+
+    _basic: dict[Combining, TransformationList]
+    _main: dict[Combining, TransformationList]
+    _meta: dict[Combining, dict[FeatureMask, tuple[list[Transformation], FirstApplicable]]]
+
+    def __init__(self, *, compiled: bool = True) -> None:
+        data = get_data()
+        meta: dict[Combining, dict[FeatureMask, list[Transformation]]] = {}
+        for combining, transformations in data.combining_meta.items():
+            by_requirements = meta.setdefault(combining, {})
+            for transformation in transformations:
+                by_requirements.setdefault(transformation.required, []).append(transformation)
+        lists = [*data.combining_basic.values(), *data.combining_main.values()]
+        meta_lists = [transformations
+                      for by_requirements in meta.values()
+                      for transformations in by_requirements.values()]
+        applicability, first_applicable = (TransformationIndex._generate(lists, meta_lists) if compiled
+                                           else (list(map(interpret_applicability, lists)),
+                                                 list(map(interpret_first_applicable, meta_lists))))
+        functions = iter(applicability)
+        self._basic = TransformationIndex._index(data.combining_basic, functions)
+        self._main = TransformationIndex._index(data.combining_main, functions)
+        meta_functions = iter(first_applicable)
+        self._meta = {
+            combining: {
+                required: (transformations, next(meta_functions))
+                for required, transformations in by_requirements.items()
+            }
+            for combining, by_requirements in meta.items()
+        }
+
+    @staticmethod
+    def _generate(lists: list[list[Transformation]],
+                  meta_lists: list[list[Transformation]]) -> tuple[list[Applicability], list[FirstApplicable]]:
+        definitions = {f'applicable_{index}': generate_applicability(f'applicable_{index}', transformations)
+                       for index, transformations in enumerate(lists)}
+        meta_definitions = {f'first_applicable_{index}': generate_first_applicable(f'first_applicable_{index}',
+                                                                                   transformations)
+                            for index, transformations in enumerate(meta_lists)}
+        functions = compile_functions({**definitions, **meta_definitions})
+        return [functions[name] for name in definitions], [functions[name] for name in meta_definitions]
+
+    @staticmethod
+    def _index(data: CombiningData, functions: Iterator[Applicability]) -> dict[Combining, TransformationList]:
+        return {combining: TransformationList(transformations, next(functions))
+                for combining, transformations in data.items()}
+
+    def find(self, combining: Combining, features: FeatureMask, *, basic: bool, allowed: Optional[set[ChangeSequence]],
+             disallowed: Optional[set[ChangeSequence]]) -> Optional[Transformation]:
+        transformations = (self._basic if basic else self._main).get(combining)
+        return transformations.find(features, allowed, disallowed) if transformations else None
+
+    def find_meta(self, combining: Combining, features: FeatureMask,
+                  required: FeatureMask) -> Optional[Transformation]:
+        if not (entry := self._meta.get(combining, {}).get(required)):
+            return None
+        transformations, first_applicable = entry
+        index = first_applicable(features)
+        return transformations[index] if index is not None else None
+
+
+get_transformation_index = with_cache(TransformationIndex)
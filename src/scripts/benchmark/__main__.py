@@ -0,0 +1,130 @@
+from itertools import product
+from pathlib import Path
+from timeit import Timer
+import tracemalloc
+from typing import Callable
+from unicodedata import normalize
+
+from ...ipaparser import cache_clear, IPA, IPAConfig, IPASymbol, load
+from ...ipaparser._code.combiner import get_matcher, match_to_feature_sets
+from ...ipaparser._code.data import get_data
+from ...ipaparser._code.data_types import Change, Combining, CombiningType, Symbol, Transformation
+from ...ipaparser._code.ipa_symbol import from_raw
+from ...ipaparser._code.matcher import Match, MatchOption
+from ...ipaparser._code.raw_symbol import RawSymbol
+from ...ipaparser._code.strings import to_positions
+from ...ipaparser.features import Manner
+
+CORPUS = Path(__file__).parent.parent / 'feature_docs' / 'corpus'
+REPEAT = 5
+
+COMBINED_LETTERS = 'ptkbdɡmnszʃʒfvxɣaeiouəɪʊɛɔ'
+COMBINED_COUNTS = [0, 1, 10, 100, 500]
+
+TIE_CHAIN_LETTERS = 'tsaɪ'
+TIE_CHAIN_LENGTHS = [2, 3, 4, 10, 100, 1000]
+
+STACKED_BASE = 'a'
+STACKED_DIACRITICS = '̰̯̟̹̃̆'
+# Tilde below, inverted breve below, plus below, right half ring below, tilde, breve (in the canonical order, so that
+# every prefix stays the same once decomposed)
+
+MEMORY_SAMPLES = 10_000
+MEMORY_TRANSCRIPTION = '[aɪ pʰiː eɪ]'
+
+
+def measure(function: Callable[[], object]) -> float:
+    """Return the best time of a single call in microseconds."""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number * 1e6
+
+
+def measure_memory(create: Callable[[], object]) -> float:
+    """Return the memory retained by a single created object (along with the objects it owns) in bytes."""
+    create()  # warming up any caches involved
+    tracemalloc.start()
+    objects = [None] * MEMORY_SAMPLES
+    start, _ = tracemalloc.get_traced_memory()
+    for index in range(MEMORY_SAMPLES):
+        objects[index] = create()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (end - start) / MEMORY_SAMPLES
+
+
+def report(name: str, microseconds: float) -> None:
+    print(f'{name:<40}{microseconds:>12.2f} µs')
+
+
+def report_memory(name: str, size: float) -> None:
+    print(f'{name:<40}{size:>12.1f} B')
+
+
+def read_corpus() -> list[str]:
+    with open(CORPUS, 'r') as corpus:
+        return [line.strip() for line in corpus if line.strip()]
+
+
+def benchmark_corpus() -> None:
+    transcriptions = read_corpus()
+    report(f'corpus ({len(transcriptions)} transcriptions)',
+           measure(lambda: [IPA(transcription) for transcription in transcriptions]))
+
+
+def benchmark_combined() -> None:
+    transcriptions = read_corpus()
+    for count in COMBINED_COUNTS:
+        config = IPAConfig(combined=list(product(COMBINED_LETTERS, repeat=2))[:count])
+        report(f'corpus with {count} combined sequences',
+               measure(lambda: [IPA(transcription, config) for transcription in transcriptions]))
+
+
+def benchmark_tie_chains() -> None:
+    for length in TIE_CHAIN_LENGTHS:
+        chain = '\u0361'.join(TIE_CHAIN_LETTERS[index % len(TIE_CHAIN_LETTERS)] for index in range(length))
+        report(f'tie chain: {length}', measure(lambda: IPA(f'[{chain}]')))
+
+
+def benchmark_stacked_diacritics() -> None:
+    for count in range(len(STACKED_DIACRITICS) + 1):
+        symbol = normalize('NFD', STACKED_BASE + STACKED_DIACRITICS[:count])
+        positions = to_positions(symbol)
+        report(f'stacked diacritics: {count} (resolution)',
+               measure(lambda: (cache_clear('diacritics'), match_to_feature_sets(get_matcher().match(positions, 0)))))
+        report(f'stacked diacritics: {count} (memoized)',
+               measure(lambda: match_to_feature_sets(get_matcher().match(positions, 0))))
+        report(f'stacked diacritics: {count} (parsing)',
+               measure(lambda: (cache_clear('symbols'), cache_clear('words'), IPASymbol(symbol))))
+
+
+def benchmark_memory() -> None:
+    raw = RawSymbol('a', [0])
+    compound = RawSymbol('t͡s', [0], [RawSymbol('t', [0]), RawSymbol('s', [0])])
+    transformation = next(iter(get_data().combining_main.values()))[0]
+    symbol = next(iter(get_data().consonants))
+    for name, create in [
+        ('Change', lambda: Change(Manner.STOP, True)),
+        ('Combining', lambda: Combining('̃', CombiningType.DIACRITIC)),
+        ('Symbol', lambda: Symbol('a', True, 0)),
+        ('Transformation', lambda: Transformation(transformation.required, transformation.incompatible,
+                                                  transformation.changes)),
+        ('MatchOption', lambda: MatchOption(symbol, [[]])),
+        ('Match', lambda: Match(1, [])),
+        ('RawSymbol', lambda: RawSymbol('a', [0])),
+        ('IPASymbol', lambda: from_raw(raw)),
+        ('IPASymbol (compound)', lambda: from_raw(compound)),
+        (f'IPA {MEMORY_TRANSCRIPTION}', lambda: IPA(MEMORY_TRANSCRIPTION)),
+    ]:
+        report_memory(f'memory: {name}', measure_memory(create))
+
+
+load()
+for benchmark in [
+    benchmark_corpus,
+    benchmark_combined,
+    benchmark_tie_chains,
+    benchmark_stacked_diacritics,
+    benchmark_memory,
+]:
+    benchmark()
@@ -0,0 +1,49 @@
+from pathlib import Path
+import sys
+import unicodedata
+
+from ...ipaparser._code.combining_ranges import COMBINING_RANGES, Ranges
+
+OUTPUT = Path(__file__).parent.parent.parent / 'ipaparser' / '_code' / 'combining_ranges.py'
+RANGES_PER_LINE = 4
+INDENT = ' ' * 4
+
+HEADER = '''\
+# Generated by `python -m src.scripts.combining_ranges`, which adds the table for the Unicode version of the Python
+# running it (and keeps the other ones)
+
+__all__ = [
+    'COMBINING_RANGES',
+    'Ranges',
+]
+
+Ranges = tuple[tuple[int, int], ...]  # inclusive code point ranges
+
+# Characters with a non-zero canonical combining class, by Unicode version
+COMBINING_RANGES: dict[str, Ranges] = {'''
+
+
+def collect_ranges() -> Ranges:
+    ranges: list[tuple[int, int]] = []
+    for code in range(sys.maxunicode + 1):
+        if unicodedata.combining(chr(code)):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1] = (ranges[-1][0], code)
+            else:
+                ranges.append((code, code))
+    return tuple(ranges)
+
+
+def format_table(tables: dict[str, Ranges]) -> str:
+    lines = [HEADER]
+    for version, ranges in sorted(tables.items(), key=lambda item: tuple(map(int, item[0].split('.')))):
+        lines.append(f'{INDENT}{repr(version)}: (')
+        for start in range(0, len(ranges), RANGES_PER_LINE):
+            lines.append(INDENT * 2 + ' '.join(f'(0x{first:04X}, 0x{last:04X}),'
+                                               for first, last in ranges[start:start + RANGES_PER_LINE]))
+        lines.append(f'{INDENT}),')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+OUTPUT.write_text(format_table({**COMBINING_RANGES, unicodedata.unidata_version: collect_ranges()}))
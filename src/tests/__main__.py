@@ -1,6 +1,10 @@
+from tempfile import TemporaryDirectory
 from unittest import defaultTestLoader, TestSuite, TextTestRunner
+from unittest.mock import patch
 
 from .test_api import TestApi
+from .test_compiled import TestCompiled
+from .test_concurrency import TestConcurrency
 from .test_features import TestFeatures
 from .test_known import TestKnown
 from .test_loading import TestLoading
@@ -11,7 +15,11 @@ for test_case in [
     TestKnown,
     TestApi,
     TestFeatures,
+    TestCompiled,
+    TestConcurrency,
 ]:
     suite.addTest(defaultTestLoader.loadTestsFromTestCase(test_case))
 
-TextTestRunner().run(suite)
+# Keep the persistent caches written while testing out of the user's cache directory
+with TemporaryDirectory() as cache_directory, patch.dict('os.environ', {'IPAPARSER_CACHE_DIR': cache_directory}):
+    TextTestRunner().run(suite)
@@ -2,7 +2,7 @@ from pathlib import Path
 from typing import Iterable, Optional
 from unicodedata import normalize
 
-from ....ipaparser import IPA, IPAConfig, IPASymbol
+from ....ipaparser import IPA, IPAConfig, IPASymbol, parse_variants
 from ....ipaparser.definitions import BracketStrategy
 from ....ipaparser.features import Feature, FEATURE_KINDS, FeatureSet
 
@@ -51,8 +51,8 @@ def process_symbol(symbol: IPASymbol) -> None:
 
 
 def process_transcription_and_symbols(transcription: str) -> None:
-    for config in [IPAConfig(), IPAConfig(substitutions=True, brackets=BracketStrategy.EXPAND)]:
-        ipa = IPA(transcription, config)
+    configs = [IPAConfig(), IPAConfig(substitutions=True, brackets=BracketStrategy.EXPAND)]
+    for ipa in parse_variants(transcription, configs):
         transcriptions.add(format_line(str(ipa), VALUE_DELIMITER.join(str(symbol) for symbol in ipa)))
         for symbol in ipa:
             process_symbol(symbol)
@@ -1,11 +1,27 @@
+from pathlib import Path
+import sqlite3
+from tempfile import TemporaryDirectory
 from typing import Any, Optional
 import unicodedata
 from unittest import TestCase
-
-from ..ipaparser import IPA, IPAConfig, IPASymbol
+from weakref import ref
+
+from ..ipaparser import (
+    cache_clear,
+    cache_info,
+    IPA,
+    IPAConfig,
+    IPASymbol,
+    normalize,
+    parse_variants,
+    ParserSession,
+    set_cache_size,
+    use_persistent_cache,
+)
 from ..ipaparser.definitions import BracketStrategy, TranscriptionType
 from ..ipaparser.exceptions import (
     BracketStrategyError,
+    CacheError,
     CombinedLengthError,
     CombinedSoundError,
     EnclosingError,
@@ -122,6 +138,103 @@ class TestApi(TestCase):
             IPAConfig(brackets='ignore')  # type: ignore
         self.assertEqual(context.exception.value, 'ignore')
 
+    def test_normalize(self) -> None:
+        for string, config, normalized in [
+            ('', IPAConfig(), ''),
+            ('ã', IPAConfig(), 'a\u0303'),
+            ("'ga:", IPAConfig(), "'ga:"),
+            ("'ga:", IPAConfig(substitutions=True), 'ˈɡaː'),
+            ('t:͡ʂ', IPAConfig(substitutions=True), 'ʈː͡ʂ'),
+            ('tʂ', IPAConfig(substitutions=True, combined=[('t', 'ʂ')]), 'ʈ͡ʂ'),
+            ('o(:)', IPAConfig(substitutions=True, brackets=BracketStrategy.EXPAND), 'oː'),
+            ('a(b(c)d)e(f', IPAConfig(brackets=BracketStrategy.STRIP), 'ae(f'),
+            ('bə(j)ɪz⁽ʲ⁾ˈlʲivɨj', IPAConfig(brackets=BracketStrategy.KEEP), 'bə(j)ɪz⁽ʲ⁾ˈlʲivɨj'),
+        ]:
+            self.assertEqual(normalize(string, config), normalized)
+            self.assertEqual(str(IPASymbol(string, config)), normalized)
+        self.assertEqual(normalize('ã'), 'a\u0303')
+
+    def test_sessions(self) -> None:
+        for config in [
+            IPAConfig(),
+            IPAConfig(substitutions=True, brackets=BracketStrategy.STRIP),
+            IPAConfig(brackets=BracketStrategy.EXPAND, combined=[('t', 's'), ('a', 'ɪ')]),
+        ]:
+            session = ParserSession(config)
+            self.assertEqual(session.config, config)
+            for transcription in ['[tsaɪ]', "/t(s)a'ɪ/", '[ga:(j)]', '[]']:
+                self.assertEqual(str(session.parse(transcription)), str(IPA(transcription, config)))
+                self.assertEqual(to_features(session.parse(transcription)), to_features(IPA(transcription, config)))
+                self.assertEqual(session.normalize(transcription), normalize(transcription, config))
+                self.assertEqual(str(session.parse_symbol(transcription)), str(IPASymbol(transcription, config)))
+                self.assertEqual(session.parse_symbol(transcription).features(),
+                                 IPASymbol(transcription, config).features())
+            self.assertEqual(list(map(str, session.parse_many(['[tsaɪ]', '/ga:/']))),
+                             [str(IPA('[tsaɪ]', config)), str(IPA('/ga:/', config))])
+            self.assertEqual(session.parse_many([]), [])
+            with self.assertRaises(EnclosingError):
+                session.parse('tsaɪ')
+            with self.assertRaises(EnclosingError):
+                session.parse_many(['[a]', 'a'])
+        self.assertEqual(ParserSession().config, IPAConfig())
+
+    def test_variants(self) -> None:
+        configs = [
+            IPAConfig(),
+            IPAConfig(brackets=BracketStrategy.EXPAND),
+            IPAConfig(brackets=BracketStrategy.STRIP, substitutions=True),
+            IPAConfig(brackets=BracketStrategy.EXPAND, substitutions=True),
+            IPAConfig(brackets=BracketStrategy.EXPAND, substitutions=True, combined=[('t', 's')]),
+        ]
+        for transcription in ['[bə(j)ɪz⁽ʲ⁾ˈlʲivɨj]', '/ts:a/', '[ts:a (d)a]', '[]']:
+            variants = parse_variants(transcription, configs)
+            self.assertEqual(len(variants), len(configs))
+            for variant, config in zip(variants, configs):
+                self.assertEqual(variant, IPA(transcription, config))
+                self.assertEqual(to_features(variant), to_features(IPA(transcription, config)))
+        expanded, _, _, substituted = parse_variants('[ba]', configs[1:2] + configs[:1] + configs[2:4])
+        self.assertIsNot(expanded, substituted)
+        self.assertTrue(all(left is right for left, right in zip(expanded, substituted)))
+        self.assertEqual(parse_variants('[a]', []), [])
+        with self.assertRaises(EnclosingError):
+            parse_variants('a', configs)
+
+    def test_persistent_cache(self) -> None:
+        config = IPAConfig(substitutions=True, combined=[('t', 's')])
+        transcriptions = ['[tsa:]', '/ˈpʰɹɛʔt͡sɫ̩/', '[aɪ pʰiː eɪ]', '[]']
+        expected = [(str(IPA(transcription, config)), to_features(IPA(transcription, config)))
+                    for transcription in transcriptions]
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'parses.sqlite3'
+
+            def count_stored() -> int:
+                with sqlite3.connect(path) as connection:
+                    return connection.execute('SELECT COUNT(*) FROM parses').fetchone()[0]
+
+            try:
+                use_persistent_cache(path)
+                ParserSession(config).warm_up(transcriptions)
+                use_persistent_cache(None)
+                self.assertEqual(count_stored(), len(transcriptions))
+
+                use_persistent_cache(path)
+                cache_clear()
+                parsed = ParserSession(config).parse_many(transcriptions)
+                self.assertEqual([(str(ipa), to_features(ipa)) for ipa in parsed], expected)
+                # Results are shared by the configurations normalizing the input identically
+                parsed = ParserSession(IPAConfig(substitutions=True, combined=[('t', 's'), ('x', 'y')])).parse_many(
+                    transcriptions)
+                self.assertEqual([(str(ipa), to_features(ipa)) for ipa in parsed], expected)
+                self.assertEqual(cache_info()['words'].misses, 0)
+                use_persistent_cache(None)
+
+                with sqlite3.connect(path) as connection:
+                    connection.execute("UPDATE meta SET value = 'stale' WHERE key = 'fingerprint'")
+                use_persistent_cache(path)
+                self.assertEqual(count_stored(), 0)
+            finally:
+                use_persistent_cache(None)
+
     def test_combined(self) -> None:
         with self.assertRaises(CombinedLengthError) as context:
             IPAConfig(combined=[()])
@@ -266,6 +379,21 @@ class TestApi(TestCase):
         self.assertEqual(IPA('/aoua͡ou/', IPAConfig(combined=[('a͡o', 'u')])), '/aoua͡o͡u/')
         self.assertEqual(IPA('/aoua͡ou/', IPAConfig(combined=[('ao', 'u')])), '/ao͡ua͡ou/')
 
+    def test_many_combined(self) -> None:
+        # Enough sequences for them to be searched for with an automaton rather than one by one
+        combined = [('t', 's'), ('s', 'ʃ'), ('d', 'z'), ('d͡z', 'ʒ'), ('a', 'ɪ'), ('ɪ', 'ə'), ('ɔ', 'ɪ'), ('t͡s', 'ʰ'),
+                    ('k', 'x'), ('p', 'f'), ('tː', 's'), ('t', 'sː')]
+        transcriptions = ['/tsʃa/', '[dzʒaɪə]', '[aɪəɔɪ]', '[tsʰ kx pf]', '[ʃts]', '[dz dʒ tʃ]', '[tsː tːs]', '[ʃ͡ts]']
+        for sequences, expected in [
+            (combined, ['/t͡s͡ʃa/', '[d͡z͡ʒa͡ɪ͡ə]', '[a͡ɪ͡əɔ͡ɪ]', '[t͡s͡ʰ k͡x p͡f]', '[ʃt͡s]', '[d͡z dʒ tʃ]',
+                        '[t͡sː tː͡s]', '[ʃ͡t͡s]']),
+            # Sequences including ties only match the ones inserted by the sequences preceding them
+            (combined[::-1], ['/t͡s͡ʃa/', '[d͡zʒa͡ɪ͡ə]', '[a͡ɪ͡əɔ͡ɪ]', '[t͡sʰ k͡x p͡f]', '[ʃt͡s]', '[d͡z dʒ tʃ]',
+                              '[t͡sː tː͡s]', '[ʃ͡t͡s]']),
+        ]:
+            config = IPAConfig(combined=sequences)
+            self.assertEqual([str(IPA(transcription, config)) for transcription in transcriptions], expected)
+
     def test_symbol_features(self) -> None:
         unknown = 'unknown'
 
@@ -499,3 +627,87 @@ class TestApi(TestCase):
         self.assertEqual(list(IPA('[̃a]')), ['̃', 'a'])
         self.assertEqual(IPA('[̃a]')[0].features(), None)
         self.assertNotEqual(IPA('[̃a]')[1].features(), None)
+
+    def test_symbol_sharing(self) -> None:
+        self.assertIs(IPASymbol('pʰ'), IPASymbol('pʰ'))
+        self.assertIs(IPASymbol('t͡s').components, IPASymbol('t͡s', IPAConfig()).components)
+        session = ParserSession()
+        self.assertIs(session.parse_symbol('pʰ'), session.parse_symbol('pʰ'))
+        self.assertIs(session.parse_symbol('pʰ'), IPASymbol('pʰ'))
+        config = IPAConfig(substitutions=True)
+        symbol = IPASymbol('g', config)
+        cache_clear('pipelines')  # the symbols remain shared even once the pipeline is gone
+        self.assertIs(ParserSession(IPAConfig(substitutions=True)).parse_symbol('g'), symbol)
+        self.assertIsNot(IPASymbol('g'), IPASymbol('g', IPAConfig(substitutions=True)))
+        self.assertEqual(str(IPASymbol('g', IPAConfig(substitutions=True))), 'ɡ')
+        self.assertIsNot(IPA('[pʰ]')[0], IPASymbol('pʰ'))
+        self.assertEqual(IPA('[pʰ]')[0], IPASymbol('pʰ'))
+
+        default_size = cache_info()['symbols'].maxsize
+        set_cache_size('symbols', 0)
+        self.assertIsNot(IPASymbol('pʰ'), IPASymbol('pʰ'))
+        self.assertEqual(IPASymbol('pʰ').features(), IPASymbol('pʰ').features())
+        set_cache_size('symbols', default_size)
+
+    def test_weak_references(self) -> None:
+        ipa = IPA('[t͡sa]')
+        symbol = IPASymbol('t͡s')
+        self.assertIs(ref(ipa)(), ipa)
+        self.assertIs(ref(symbol)(), symbol)
+        self.assertIs(ref(ipa[0])(), ipa[0])
+
+    def test_caches(self) -> None:
+        symbol = 'ŋ̥̰'  # a base letter that can start a longer symbol (like ŋǃ), so that lookups are not table-driven
+        self.assertTrue(cache_info())
+        features = IPASymbol(symbol).features()
+        self.assertNotEqual(features, None)
+
+        default_size = cache_info()['diacritics'].maxsize
+        cache_clear()
+        self.assertTrue(all(info.hits == info.misses == info.currsize == 0 for info in cache_info().values()))
+
+        set_cache_size('diacritics', 0)
+        self.assertEqual(cache_info()['diacritics'].maxsize, 0)
+        self.assertEqual(IPA(f'[{symbol}{symbol}]')[1].features(), features)
+        self.assertEqual(cache_info()['diacritics'].currsize, 0)
+
+        set_cache_size('diacritics', 10)
+        cache_clear('spans')
+        cache_clear('words')
+        self.assertEqual(IPA(f'[{symbol}{symbol}]')[1].features(), features)
+        self.assertEqual(cache_info()['diacritics'].maxsize, 10)
+        self.assertTrue(0 < cache_info()['diacritics'].currsize <= 10)
+
+        cache_clear('diacritics')
+        self.assertEqual(cache_info()['diacritics'].currsize, 0)
+        set_cache_size('diacritics', default_size)
+
+        self.assertEqual(cache_info()['parses'].maxsize, 0)
+        set_cache_size('parses', 2)
+        for transcription in ['[abc]', '[abc]', '[def]', '[ghi]', '[abc]']:
+            self.assertEqual(to_features(IPA(transcription)), to_features(IPA(transcription, IPAConfig())))
+        self.assertEqual(cache_info()['parses'].hits, 6)  # misses: [abc], [def], [ghi], and [abc] once evicted
+        self.assertEqual(cache_info()['parses'].currsize, 2)
+        IPA('[abc]', IPAConfig(substitutions=True))  # normalized identically, so the result is shared
+        self.assertEqual(cache_info()['parses'].hits, 7)
+        self.assertEqual(str(IPASymbol('abc')), 'abc')
+        self.assertEqual(cache_info()['parses'].currsize, 2)
+        set_cache_size('parses', 0)
+
+        transcription = '[ˈpʰɹɛʔt͡sɫ̩ aɪ pʰiː eɪ]'
+        expected = to_features(IPA(transcription))
+        for name in ['position_table', 'position_codes']:
+            default_size = cache_info()[name].maxsize
+            self.assertTrue(cache_info()[name].currsize > 0)
+            for size in [0, 1, 3]:
+                set_cache_size(name, size)
+                self.assertEqual(to_features(IPA(transcription)), expected)
+                self.assertTrue(cache_info()[name].currsize <= max(size, len(transcription)))
+            set_cache_size(name, default_size)
+
+        for name in ['unknown', '']:
+            with self.assertRaisesRegex(CacheError, r"'diacritics'") as context:
+                set_cache_size(name, 10)
+            self.assertEqual(context.exception.value, name)
+            with self.assertRaises(CacheError):
+                cache_clear(name)
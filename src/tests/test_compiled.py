@@ -0,0 +1,118 @@
+from itertools import combinations
+import os
+from pathlib import Path
+import sys
+from tempfile import TemporaryDirectory
+import unicodedata
+from unittest import skipIf, TestCase
+from unittest.mock import patch
+
+from ..ipaparser._code.automaton import Automaton
+from ..ipaparser._code.combiner import build_matcher
+from ..ipaparser._code.combining_ranges import COMBINING_RANGES
+from ..ipaparser._code.data import get_data, load_data
+from ..ipaparser._code.disk_cache import get_directory
+from ..ipaparser._code.feature_helper import iterate_bits
+from ..ipaparser._code.parser import collect_separators, collect_terminal_span_data
+from ..ipaparser._code.strings import build_position_pattern, to_positions
+from ..ipaparser._code.transformation_index import TransformationIndex
+
+__all__ = [
+    'TestCompiled',
+]
+
+MAX_COMBINED_BITS = 2  # relevant features are toggled in every combination of up to this many at once
+
+
+class TestCompiled(TestCase):
+    def test_generated_code(self) -> None:
+        data = get_data()
+        compiled = TransformationIndex()
+        interpreted = TransformationIndex(compiled=False)
+        for combining_data, basic in [
+            (data.combining_basic, True),
+            (data.combining_main, False),
+            (data.combining_meta, None),
+        ]:
+            for combining, transformations in combining_data.items():
+                bits = sorted({1 << index
+                               for transformation in transformations
+                               for index in iterate_bits(transformation.dependencies)})
+                for base in [0, *(transformation.present for transformation in transformations)]:
+                    for count in range(MAX_COMBINED_BITS + 1):
+                        for subset in combinations(bits, count):
+                            features = base ^ sum(subset)
+                            if basic is None:
+                                for transformation in transformations:
+                                    self.assertIs(compiled.find_meta(combining, features, transformation.required),
+                                                  interpreted.find_meta(combining, features, transformation.required))
+                            else:
+                                self.assertIs(compiled.find(combining, features, basic=basic,
+                                                            allowed=None, disallowed=None),
+                                              interpreted.find(combining, features, basic=basic,
+                                                               allowed=None, disallowed=None))
+
+    def test_snapshots(self) -> None:
+        loaders = [load_data, build_matcher, collect_separators, collect_terminal_span_data]
+        with TemporaryDirectory() as directory, patch.dict('os.environ', {'IPAPARSER_CACHE_DIR': directory}):
+            abandoned = ['snapshot-data-abandoned.pickle', 'snapshot-matcher-abandoned.pickle']
+            in_use = 'snapshot-data-in-use.pickle'
+            for name in [*abandoned, in_use]:
+                (Path(directory) / name).write_bytes(b'snapshot')
+            for name in abandoned:
+                os.utime(Path(directory) / name, (0, 0))
+            generated = [loader() for loader in loaders]
+            self.assertEqual(len(list(Path(directory).iterdir())), len(loaders) + 1)
+            self.assertTrue((Path(directory) / in_use).exists())
+            (Path(directory) / in_use).unlink()
+            restored = [loader() for loader in loaders]
+            for file in Path(directory).iterdir():
+                file.write_bytes(b'damaged')
+            regenerated = [loader() for loader in loaders]
+            for data, matcher, separators, terminals in [restored, regenerated]:
+                self.assertEqual(data, generated[0])
+                for symbol in data.consonants | data.vowels | data.breaks | data.suprasegmentals:
+                    positions = to_positions(symbol.string)
+                    self.assertEqual(matcher.match(positions, 0), generated[1].match(positions, 0))
+                self.assertEqual(separators, generated[2])
+                self.assertEqual(terminals, generated[3])
+
+    @skipIf(sys.platform == 'win32', 'directories are not checked for ownership and permissions on Windows')
+    def test_shared_cache_directory(self) -> None:
+        with TemporaryDirectory() as directory, patch.dict('os.environ', {'IPAPARSER_CACHE_DIR': directory}):
+            self.assertEqual(get_directory(), Path(directory))
+            os.chmod(directory, 0o777)
+            self.assertIsNone(get_directory())
+            self.assertEqual(load_data(), get_data())
+            self.assertEqual(list(Path(directory).iterdir()), [])
+
+    @skipIf(sys.platform == 'win32', 'home directories are not looked up in the user database on Windows')
+    def test_no_home_directory(self) -> None:
+        with patch.dict('os.environ'), patch('pwd.getpwuid', side_effect=KeyError('getpwuid(): uid not found')):
+            for variable in ['HOME', 'XDG_CACHE_HOME', 'IPAPARSER_CACHE_DIR']:
+                os.environ.pop(variable, None)
+            self.assertIsNone(get_directory())
+            self.assertEqual(load_data(), get_data())
+            TransformationIndex()
+
+    def test_combining_ranges(self) -> None:
+        if (ranges := COMBINING_RANGES.get(unicodedata.unidata_version)) is None:
+            self.skipTest(f'No combining table for Unicode {unicodedata.unidata_version}')
+        combining = {code for first, last in ranges for code in range(first, last + 1)}
+        for code in range(sys.maxunicode + 1):
+            self.assertEqual(code in combining, unicodedata.combining(chr(code)) != 0)
+        pattern = build_position_pattern()
+        self.assertIsNotNone(pattern)
+        for string in ['ã̰b', '̃a', 'ɑ̃ː͡ɪ̯', 'x\U000e0100\U0001e130\U0001d167y']:
+            starts = [index for index in range(len(string)) if index == 0 or not unicodedata.combining(string[index])]
+            self.assertEqual(pattern.findall(string), [string[start:end]
+                                                       for start, end in zip(starts, starts[1:] + [len(string)])])
+
+    def test_automaton(self) -> None:
+        keywords = ['ts', 'sʃ', 'tsʃ', 's', 'ʃa', 'at', 'ts']
+        automaton = Automaton(keywords)
+        for string in ['', 'tsʃa', 'tʃsa', 'ats', 'xyz', 'ttsʃʃ', 'ʃ']:
+            self.assertEqual(automaton.find(string), {index for index, keyword in enumerate(keywords)
+                                                      if keyword in string})
+        self.assertEqual(automaton.find('tsʃa'), {0, 1, 2, 3, 4, 6})
+        self.assertEqual(Automaton([]).find('abc'), set())
@@ -0,0 +1,123 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import sleep
+from typing import Callable
+from unittest import TestCase
+
+from ..ipaparser import flight_info, IPA, IPAConfig
+from ..ipaparser._code.cacher import SingleFlight
+from ..ipaparser._code.parse_store import ParseStore
+from ..ipaparser._code.raw_symbol import RawSymbol
+
+__all__ = [
+    'TestConcurrency',
+]
+
+THREADS = 8
+POLLING_INTERVAL = 0.001
+
+
+def wait_until(condition: Callable[[], bool]) -> None:
+    while not condition():
+        sleep(POLLING_INTERVAL)
+
+
+class TestConcurrency(TestCase):
+    def test_single_flight(self) -> None:
+        release = Event()
+        computed: list[str] = []
+
+        def compute(string: str) -> list[str]:
+            release.wait()
+            computed.append(string)
+            return [string]
+
+        flight = SingleFlight(compute)
+        results: list[list[str]] = []
+        threads = [Thread(target=lambda: results.append(flight('abc'))) for _ in range(THREADS)]
+        threads[0].start()
+        wait_until(lambda: flight.info().in_flight == 1)
+        for thread in threads[1:]:
+            thread.start()
+        wait_until(lambda: flight.info().calls == THREADS)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(computed, ['abc'])
+        self.assertEqual(len(results), THREADS)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.info(), (THREADS, THREADS - 1, 0))
+        self.assertEqual(flight('def'), ['def'])
+        self.assertEqual(flight.info(), (THREADS + 1, THREADS - 1, 0))
+
+    def test_single_flight_errors(self) -> None:
+        release = Event()
+
+        def compute(string: str) -> str:
+            release.wait()
+            raise ValueError(string)
+
+        flight = SingleFlight(compute)
+        errors: list[Exception] = []
+
+        def call() -> None:
+            try:
+                flight('abc')
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [Thread(target=call) for _ in range(THREADS)]
+        threads[0].start()
+        wait_until(lambda: flight.info().in_flight == 1)
+        for thread in threads[1:]:
+            thread.start()
+        wait_until(lambda: flight.info().calls == THREADS)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), THREADS)
+        self.assertEqual(flight.info().in_flight, 0)
+
+    def test_concurrent_parses(self) -> None:
+        transcriptions = ['[ˈpʰɹɛʔt͡sɫ̩]', '/aɪ pʰiː eɪ/', '[ˈpʰɹɛʔt͡sɫ̩]']
+        config = IPAConfig(substitutions=True)
+        expected = [list(map(str, IPA(transcription, config))) for transcription in transcriptions]
+        calls = flight_info()['parses'].calls
+        results: list[list[list[str]]] = []
+        threads = [Thread(target=lambda: results.append([list(map(str, IPA(transcription, config)))
+                                                         for transcription in transcriptions]))
+                   for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected] * THREADS)
+        info = flight_info()['parses']
+        self.assertEqual(info.calls - calls, THREADS * len(transcriptions))
+        self.assertEqual(info.in_flight, 0)
+
+    def test_shared_persistent_cache(self) -> None:
+        symbols = [RawSymbol('t͡s', [1, 2], [RawSymbol('t', [1]), RawSymbol('s', [2])]), RawSymbol('a', [])]
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'parses.sqlite3'
+            first, second = ParseStore(path), ParseStore(path)
+            try:
+                first.put(False, 'tsa', symbols)
+                self.assertEqual(first.get(False, 'tsa'), symbols)
+                self.assertIsNone(second.get(False, 'tsa'))
+                first.flush()
+                self.assertEqual(second.get(False, 'tsa'), symbols)
+
+                # Neither reading nor buffered writing by one connection may keep the other one from writing (which
+                # would make the latter's writes time out and get dropped)
+                first.put(False, 'ts', symbols[:1])
+                self.assertIsNone(first.get(True, 'tsa'))
+                second.put(True, 'tsa', symbols)
+                second.flush()
+                self.assertEqual(first.get(True, 'tsa'), symbols)
+                first.flush()
+                self.assertEqual(second.get(False, 'ts'), symbols[:1])
+            finally:
+                first.close()
+                second.close()